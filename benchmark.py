@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Benchmark für den Blood Pressure Analyzer
+Erzeugt synthetische Blutdruckdaten und misst die Laufzeit der einzelnen
+Analyse-Schritte, damit Regressionen zwischen Versionen sichtbar werden.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import matplotlib
+matplotlib.use('Agg')
+
+from measurement_series import MeasurementSeries, US_PER_SECOND
+from blood_pressure_analyzer import BloodPressureAnalyzer, get_cache_dir
+
+# Messzeitpunkte je Tag (Minuten nach Mitternacht) für die 1.-4. Messung
+READING_SLOTS = np.array([6 * 60 + 30, 12 * 60 + 30, 19 * 60, 22 * 60])
+# Maximale Streuung um den Messzeitpunkt (Minuten)
+READING_JITTER = 60
+# Anteil der ersten Tagesmessungen, die nachts (02:00-03:59) stattfinden,
+# damit auch die Lücke/Doppelung der Zeitumstellung getroffen wird
+NIGHT_READING_SHARE = 0.02
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+RESULTS_DIR = Path('benchmark_results')
+# Schritte unterhalb dieser Laufzeit (Sekunden) gelten beim Vergleich als Messrauschen
+MIN_COMPARE_SECONDS = 0.005
+
+
+def generate_measurements(rows, seed=0, tz_name='Europe/Berlin', start_date='2015-01-01'):
+    """
+    Erzeugt realistische synthetische Blutdruckmessungen
+
+    Pro Tag werden 1-4 Messungen erzeugt (morgens, mittags, abends, spät).
+    Die Ortszeit wird in der angegebenen Zeitzone interpretiert, sodass die
+    UTC-Offsets mit Sommer-/Winterzeit wechseln.
+
+    Args:
+        rows: Anzahl Messungen
+        seed: Startwert des Zufallsgenerators
+        tz_name: IANA Zeitzone (z.B. 'Europe/Berlin')
+        start_date: Erster Messtag
+
+    Returns:
+        Zeitlich sortierte MeasurementSeries
+    """
+    rng = np.random.default_rng(seed)
+
+    # Messungen pro Tag bestimmen, bis die gewünschte Anzahl erreicht ist
+    per_day = rng.integers(1, len(READING_SLOTS) + 1, size=max(rows, 1))
+    days = int(np.searchsorted(np.cumsum(per_day), rows)) + 1
+    per_day = per_day[:days]
+    per_day[-1] -= int(per_day.sum()) - rows
+    day_index = np.repeat(np.arange(days), per_day)
+    day_starts = np.repeat(np.cumsum(per_day) - per_day, per_day)
+    slot = np.arange(rows) - day_starts
+
+    minutes = READING_SLOTS[slot] + rng.integers(0, READING_JITTER, size=rows)
+    night = (slot == 0) & (rng.random(rows) < NIGHT_READING_SHARE)
+    minutes[night] = 120 + rng.integers(0, 120, size=int(night.sum()))
+    seconds = day_index * 86_400 + minutes * 60 + rng.integers(0, 60, size=rows)
+
+    local_naive = pd.DatetimeIndex(np.datetime64(start_date, 's') + seconds.astype('timedelta64[s]'))
+    # Doppelte Stunde bei der Umstellung: Winterzeit, fehlende Stunde: vorrücken
+    local = local_naive.tz_localize(tz_name, ambiguous=np.zeros(rows, dtype=bool),
+                                    nonexistent='shift_forward')
+    utc_us = local.tz_convert(None).to_numpy().astype('datetime64[us]').astype(np.int64)
+    wall_us = local.tz_localize(None).to_numpy().astype('datetime64[us]').astype(np.int64)
+
+    # Saisonaler Verlauf plus Rauschen, abends etwas höhere Werte
+    season = np.sin(day_index / 365.25 * 2 * math.pi)
+    evening = (slot >= 2).astype(np.float64)
+    sys_bp = 128 + 6 * season + 4 * evening + rng.normal(0, 11, rows)
+    dia_bp = 82 + 3 * season + 2 * evening + rng.normal(0, 7, rows)
+    pulse = 68 + 3 * evening + rng.normal(0, 9, rows)
+
+    series = MeasurementSeries(
+        utc_us,
+        (wall_us - utc_us) // US_PER_SECOND,
+        np.clip(sys_bp, 80, 230).round(),
+        np.clip(dia_bp, 40, 140).round(),
+        np.clip(pulse, 35, 180).round()
+    )
+    return series.sorted()
+
+
+def _format_offsets(offsets):
+    """Formatiert UTC-Offsets (Sekunden) als '+HH:MM'"""
+    unique, inverse = np.unique(offsets, return_inverse=True)
+    labels = []
+    for offset in unique.tolist():
+        sign = '+' if offset >= 0 else '-'
+        hours, minutes = divmod(abs(offset) // 60, 60)
+        labels.append(f'{sign}{hours:02d}:{minutes:02d}')
+    return np.array(labels)[inverse.ravel()]
+
+
+def write_csv(series, path):
+    """
+    Schreibt eine MeasurementSeries im Export-Format Date,SYS,DIA,BPM
+
+    Args:
+        series: MeasurementSeries
+        path: Zieldatei
+    """
+    local = np.datetime_as_string(series.local_datetimes, unit='ms')
+    dates = np.char.add(local, _format_offsets(series.utc_offset))
+    pd.DataFrame({
+        'Date': dates,
+        'SYS': series.sys,
+        'DIA': series.dia,
+        'BPM': series.pulse
+    }).to_csv(path, index=False)
+
+
+def generate_withings_groups(series):
+    """
+    Erzeugt Withings 'measuregrps' (wie von der getmeas API geliefert)
+
+    Args:
+        series: MeasurementSeries
+
+    Returns:
+        Liste von Messgruppen-Dictionaries
+    """
+    dates = (series.timestamp // US_PER_SECOND).tolist()
+    return [
+        {
+            'grpid': grpid,
+            'attrib': 0,
+            'date': date,
+            'category': 1,
+            'measures': [
+                {'value': dia_bp, 'type': 9, 'unit': 0},
+                {'value': sys_bp, 'type': 10, 'unit': 0},
+                {'value': pulse, 'type': 11, 'unit': 0}
+            ]
+        }
+        for grpid, (date, sys_bp, dia_bp, pulse) in enumerate(
+            zip(dates, series.sys.tolist(), series.dia.tolist(), series.pulse.tolist()))
+    ]
+
+
+def _timed(func, *args):
+    """Führt func aus (ohne Konsolenausgabe) und liefert die Laufzeit in Sekunden"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func(*args)
+        return time.perf_counter() - start
+
+
+def _run_pipeline(csv_path, work_dir, with_pdf):
+    """
+    Führt alle öffentlichen Schritte des Analyzers einmal aus
+
+    Returns:
+        Dictionary Schritt -> Laufzeit in Sekunden
+    """
+    timings = {}
+    analyzer = BloodPressureAnalyzer(str(csv_path), use_cache=False)
+    timings['load_data'] = _timed(analyzer.load_data)
+    timings['sort_data'] = _timed(analyzer.sort_data)
+
+    # Zeitraumfilter auf die mittlere Hälfte der Daten
+    data = analyzer.bloodpressure_complete
+    if len(data):
+        analyzer.start_time = data.datetime_at(len(data) // 4)
+        analyzer.end_time = data.datetime_at(len(data) * 3 // 4)
+    timings['filter_by_time_range'] = _timed(analyzer.filter_by_time_range)
+
+    timings['create_morning_evening_data'] = _timed(analyzer.create_morning_evening_data)
+    timings['create_morning_data'] = _timed(analyzer.create_morning_data)
+    timings['create_evening_data'] = _timed(analyzer.create_evening_data)
+
+    if with_pdf:
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            timings['create_pdf_report'] = _timed(analyzer.create_pdf_report)
+        finally:
+            os.chdir(cwd)
+
+    # Laden über den Binär-Cache (erster Lauf schreibt, zweiter liest)
+    cached = BloodPressureAnalyzer(str(csv_path), use_cache=True)
+    _timed(cached.load_data)
+    cached = BloodPressureAnalyzer(str(csv_path), use_cache=True)
+    timings['load_data_cached'] = _timed(cached.load_data)
+    return timings
+
+
+def _withings_parse_time(series, work_dir):
+    """Misst WithingsClient._process_blood_pressure_data (None falls nicht verfügbar)"""
+    try:
+        from withings_client import WithingsClient
+    except ImportError:
+        return None
+
+    groups = generate_withings_groups(series)
+    cwd = os.getcwd()
+    os.chdir(work_dir)  # Client lädt ggf. withings_config.json aus dem Arbeitsverzeichnis
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            client = WithingsClient('benchmark', 'benchmark')
+        return _timed(client._process_blood_pressure_data, groups)
+    finally:
+        os.chdir(cwd)
+
+
+def _withings_fetch_times(series, work_dir):
+    """
+    Misst Abruf und Abgleich über HTTP gegen den lokalen Withings Mock Server
+
+    Returns:
+        Dictionary Schritt -> Laufzeit in Sekunden (leer falls nicht verfügbar)
+    """
+    try:
+        from withings_client import WithingsClient
+        from withings_mock_server import start_mock_server
+    except ImportError:
+        return {}
+    from measurement_store import MeasurementStore
+
+    timings = {}
+    server = start_mock_server(generate_withings_groups(series))
+    cwd = os.getcwd()
+    os.chdir(work_dir)  # Client lädt ggf. withings_config.json aus dem Arbeitsverzeichnis
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            client = WithingsClient('benchmark', 'benchmark', api_base_url=server.url, rate_limit=None)
+        token = server.issue_token()
+        client.access_token = token['access_token']
+        client.token_expires_at = time.time() + token['expires_in']
+
+        start = series.datetime_at(0)
+        end = series.datetime_at(len(series) - 1)
+        timings['withings_fetch'] = _timed(client.get_blood_pressure_data, start, end)
+
+        store_path = Path(work_dir) / 'benchmark_store.sqlite'
+        if store_path.exists():
+            store_path.unlink()
+        with MeasurementStore(store_path) as store:
+            timings['withings_sync_store'] = _timed(client.sync_measurements, store, start)
+        store_path.unlink()
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        server.server_close()
+    return timings
+
+
+def run_benchmark(sizes, repeat=3, pdf_max_rows=10_000, withings_max_rows=1_000_000, seed=0,
+                  tz_name='Europe/Berlin', withings_fetch_max_rows=100_000):
+    """
+    Führt den Benchmark für alle Datenmengen aus
+
+    Pro Schritt wird das Minimum aus `repeat` Läufen verwendet.
+
+    Returns:
+        Dictionary mit Metadaten und Ergebnissen je Datenmenge
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bp_benchmark_') as tmp:
+        work_dir = Path(tmp)
+        for rows in sizes:
+            print(f"Erzeuge {rows} Messungen...")
+            series = generate_measurements(rows, seed=seed, tz_name=tz_name)
+            csv_path = work_dir / f'bloodpressure_{rows}.csv'
+            write_csv(series, csv_path)
+
+            best = {}
+            for _ in range(repeat):
+                shutil.rmtree(get_cache_dir(str(csv_path)), ignore_errors=True)
+                timings = _run_pipeline(csv_path, work_dir, with_pdf=rows <= pdf_max_rows)
+                if rows <= withings_max_rows:
+                    timings['withings_process_blood_pressure_data'] = _withings_parse_time(series, work_dir)
+                if rows <= withings_fetch_max_rows:
+                    timings.update(_withings_fetch_times(series, work_dir))
+                for stage, seconds in timings.items():
+                    if seconds is not None:
+                        best[stage] = min(seconds, best.get(stage, seconds))
+
+            results[str(rows)] = {stage: round(seconds, 6) for stage, seconds in best.items()}
+            for stage, seconds in best.items():
+                print(f"  {stage:40s} {seconds:10.4f} s")
+            csv_path.unlink()
+
+    return {
+        'label': _version_label(),
+        'created_at': datetime.now().astimezone().isoformat(),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'seed': seed,
+        'timezone': tz_name,
+        'results': results
+    }
+
+
+def _version_label():
+    """Ermittelt eine Versionskennung (git describe), falls verfügbar"""
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unbekannt'
+
+
+def compare_results(baseline, current, threshold=1.25):
+    """
+    Vergleicht zwei Benchmark-Ergebnisse und gibt eine Tabelle aus
+
+    Args:
+        baseline: Ergebnis-Dictionary der Vergleichsversion
+        current: Ergebnis-Dictionary der aktuellen Version
+        threshold: Faktor, ab dem ein Schritt als Regression gilt
+
+    Returns:
+        Liste der Regressionen als (Datenmenge, Schritt, Faktor)
+    """
+    regressions = []
+    print(f"\nVergleich {baseline.get('label')} -> {current.get('label')}")
+    print(f"{'Zeilen':>10s}  {'Schritt':40s} {'vorher':>10s} {'nachher':>10s} {'Faktor':>8s}")
+    for rows, stages in current['results'].items():
+        old_stages = baseline.get('results', {}).get(rows, {})
+        for stage, seconds in stages.items():
+            old = old_stages.get(stage)
+            if not old:
+                continue
+            factor = seconds / old
+            marker = ''
+            if factor > threshold and max(old, seconds) >= MIN_COMPARE_SECONDS:
+                marker = '  ⚠️  Regression'
+                regressions.append((rows, stage, factor))
+            print(f"{rows:>10s}  {stage:40s} {old:10.4f} {seconds:10.4f} {factor:8.2f}{marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark für den Blutdruckdaten-Analyzer')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                       help='Anzahl Messungen je Lauf (Standard: 1000 10000 100000 1000000, bis 10000000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Wiederholungen je Datenmenge (Minimum zählt)')
+    parser.add_argument('--pdf-max-rows', type=int, default=10_000,
+                       help='PDF-Bericht nur bis zu dieser Datenmenge messen (Standard: 10000)')
+    parser.add_argument('--withings-max-rows', type=int, default=1_000_000,
+                       help='Withings-Parser nur bis zu dieser Datenmenge messen (Standard: 1000000)')
+    parser.add_argument('--withings-fetch-max-rows', type=int, default=100_000,
+                       help='Withings-Abruf über den lokalen Mock Server nur bis zu dieser Datenmenge '
+                            'messen (Standard: 100000)')
+    parser.add_argument('--seed', type=int, default=0, help='Startwert des Zufallsgenerators')
+    parser.add_argument('--timezone', default='Europe/Berlin', help='Zeitzone der synthetischen Daten')
+    parser.add_argument('--output', type=str,
+                       help='Ergebnisdatei (Standard: benchmark_results/<Version>.json)')
+    parser.add_argument('--compare', type=str, metavar='DATEI',
+                       help='Ergebnis mit einer früheren Ergebnisdatei vergleichen')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                       help='Faktor, ab dem ein Schritt als Regression gilt (Standard: 1.25)')
+    parser.add_argument('--generate', type=str, metavar='CSV',
+                       help='Nur synthetische CSV-Datei mit der ersten Datenmenge erzeugen')
+    args = parser.parse_args()
+
+    if args.generate:
+        write_csv(generate_measurements(args.sizes[0], seed=args.seed, tz_name=args.timezone), args.generate)
+        print(f"Synthetische Daten gespeichert: {args.generate}")
+        return 0
+
+    result = run_benchmark(args.sizes, repeat=args.repeat, pdf_max_rows=args.pdf_max_rows,
+                           withings_max_rows=args.withings_max_rows, seed=args.seed,
+                           tz_name=args.timezone, withings_fetch_max_rows=args.withings_fetch_max_rows)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{result['label']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Ergebnisse gespeichert: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if compare_results(baseline, result, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
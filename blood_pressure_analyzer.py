@@ -4,16 +4,54 @@ Blutdruckdaten-Analyzer
 Analysiert Blutdruckdaten aus CSV-Dateien und erstellt Visualisierungen.
 """
 
+import time as time_module  # Für time.tzname
+# Beginn der Importzeit-Messung (--profile)
+_IMPORT_START = time_module.perf_counter()
+
 import argparse
-import csv
+import contextlib
+import copy
+import glob
+import hashlib
+import importlib
+import importlib.util
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, time
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.backends.backend_pdf import PdfPages
-import pandas as pd
 from pathlib import Path
-from collections import defaultdict
-import time as time_module  # Für time.tzname
+
+# Nicht-interaktives Backend (Agg) vor dem ersten matplotlib-Import festlegen:
+# Diagramme werden nur in Dateien geschrieben, auch ohne Display (Server, Cron)
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# Dauer der bei Bedarf nachgeladenen Module in Sekunden (--profile)
+LAZY_IMPORT_TIMES = {}
+
+
+def lazy_import(name):
+    """
+    Importiert ein Modul erst bei Bedarf und misst die Dauer des ersten Imports
+
+    matplotlib, pandas, pypdf und requests werden nur in den Schritten
+    geladen, die sie benötigen; --help, --stats mit Binär-Cache oder reine
+    CSV-Läufe laden z.B. weder requests noch pypdf.
+
+    Args:
+        name: Modulname, z.B. 'matplotlib.pyplot'
+
+    Returns:
+        Modul
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        start = time_module.perf_counter()
+        module = importlib.import_module(name)
+        LAZY_IMPORT_TIMES[name] = round(time_module.perf_counter() - start, 6)
+    return module
+
 
 def get_local_timezone():
     """Ermittelt die aktuelle lokale Zeitzone"""
@@ -44,10 +82,16 @@ def setup_x_axis_with_10_ticks(ax, timestamps, include_time=True):
     """
     if len(timestamps) == 0:
         return
+    plt = lazy_import('matplotlib.pyplot')
+    mdates = lazy_import('matplotlib.dates')
         
     # Finde den Zeitbereich
-    min_time = min(timestamps)
-    max_time = max(timestamps)
+    if isinstance(timestamps, np.ndarray):
+        min_time = timestamps.min().item()
+        max_time = timestamps.max().item()
+    else:
+        min_time = min(timestamps)
+        max_time = max(timestamps)
     
     # Erstelle 10 gleichverteilte Zeitpunkte
     time_range = max_time - min_time
@@ -77,26 +121,652 @@ def setup_x_axis_with_10_ticks(ax, timestamps, include_time=True):
     plt.setp(ax.xaxis.get_majorticklabels(), rotation=45)
 import numpy as np
 from pathlib import Path
+from measurement_series import MeasurementSeries, datetime_to_epoch_us, time_range_bounds, is_sorted_array
+from measurement_analysis import (AnalysisResult, CATEGORIES, DEFAULT_MORNING_WINDOW, DEFAULT_EVENING_WINDOW,
+                                  select_per_day, select_morning_evening)
+from rolling_stats import DEFAULT_WINDOWS, rolling_stats
+from pipeline_profiler import PipelineProfiler, DUMP_MODES, stop_tracing
+from chart_downsampling import chart_buckets, min_max_indices
+from render_cache import RenderCache
+from measurement_store import MeasurementStore
+
+# Optionale Abhängigkeiten: nur die Verfügbarkeit prüfen, Import bei Bedarf (lazy_import)
+# Withings API (withings_client benötigt requests)
+WITHINGS_AVAILABLE = importlib.util.find_spec('requests') is not None
+# Zusammenfügen parallel gerenderter PDF-Seiten
+PYPDF_AVAILABLE = importlib.util.find_spec('pypdf') is not None
+
+# Importzeit dieses Moduls einschließlich numpy, ohne nachgeladene Module (--profile)
+MODULE_IMPORT_SECONDS = round(time_module.perf_counter() - _IMPORT_START, 6)
+
+# Spalten des CSV-Exports und ihre Zieltypen
+CSV_COLUMNS = ['Date', 'SYS', 'DIA', 'BPM']
+CSV_DTYPES = {'Date': str, 'SYS': np.int16, 'DIA': np.int16, 'BPM': np.int16}
+
+
+def _parse_timezone_suffixes(suffixes, dates):
+    """
+    Bestimmt UTC-Offset und Länge der Zeitzonenangabe je Zeitstempel-Suffix
+
+    Args:
+        suffixes: Eindeutige Suffixe (letzte Zeichen der Zeitstempel)
+        dates: Ein Beispiel-Zeitstempel (String) je Suffix
+
+    Returns:
+        Tuple aus numpy Arrays: Offset in Sekunden, Länge der Zeitzonenangabe
+    """
+    offsets = np.zeros(len(suffixes), dtype=np.int64)
+    lengths = np.zeros(len(suffixes), dtype=np.int64)
+
+    for i, date in enumerate(dates):
+        offset = datetime.fromisoformat(date).utcoffset()
+        if offset is None:
+            # Ohne Zeitzone: Ortszeit wird als UTC interpretiert
+            continue
+        offsets[i] = int(offset.total_seconds())
+        if date.endswith('Z'):
+            lengths[i] = 1
+        else:
+            lengths[i] = len(date) - max(date.rfind('+'), date.rfind('-'))
+
+    return offsets, lengths
+
+
+def _parse_iso_timestamps(dates):
+    """
+    Parst eine Spalte von ISO-Zeitstempeln vektorisiert nach UTC
+
+    Die Zeitstempel werden als Byte-Matrix fester Breite verarbeitet. Der
+    UTC-Offset wird nur einmal pro unterschiedlichem Suffix (z.B. '+02:00')
+    bestimmt, die Ortszeit ohne Zeitzonenangabe parst numpy direkt.
+
+    Args:
+        dates: pandas Series mit ISO-Zeitstempeln als Strings
+
+    Returns:
+        Tuple aus numpy Arrays: Epoch-Mikrosekunden (UTC), Offsets in Sekunden
+    """
+    raw = dates.to_numpy().astype('S')
+    count, width = len(raw), raw.dtype.itemsize
+    chars = raw.view(np.uint8).reshape(count, width)
+    row_lengths = width - (chars == 0).sum(axis=1)
+
+    timestamps = np.empty(count, dtype=np.int64)
+    utc_offsets = np.zeros(count, dtype=np.int32)
+
+    # Gruppiere nach Stringlänge (in der Regel nur eine Gruppe)
+    for length in np.unique(row_lengths):
+        rows = np.flatnonzero(row_lengths == length)
+        block = chars[rows, :length]
+
+        suffix_width = min(6, length)
+        suffixes = np.ascontiguousarray(block[:, length - suffix_width:]).view(f'S{suffix_width}').ravel()
+        unique_suffixes, first_rows, inverse = np.unique(suffixes, return_index=True, return_inverse=True)
+        examples = [block[row].tobytes().decode('ascii') for row in first_rows]
+        suffix_offsets, suffix_lengths = _parse_timezone_suffixes(unique_suffixes, examples)
+
+        offsets = suffix_offsets[inverse.ravel()]
+        designator_lengths = suffix_lengths[inverse.ravel()]
+        utc_offsets[rows] = offsets
+
+        for designator_length in np.unique(designator_lengths):
+            selected = designator_lengths == designator_length
+            local_width = length - designator_length
+            local = np.ascontiguousarray(block[selected, :local_width]).view(f'S{local_width}').ravel()
+            local = local.astype('datetime64[us]').astype(np.int64)
+            timestamps[rows[selected]] = local - offsets[selected] * 1_000_000
+
+    return timestamps, utc_offsets
+
+
+def _empty_columns():
+    """Erzeugt leere Spalten-Arrays mit den Zieltypen"""
+    return {
+        'timestamp': np.empty(0, dtype=np.int64),
+        'utc_offset': np.empty(0, dtype=np.int32),
+        'sys': np.empty(0, dtype=np.int16),
+        'dia': np.empty(0, dtype=np.int16),
+        'pulse': np.empty(0, dtype=np.int16)
+    }
+
+
+def _parse_csv_frame(df):
+    """
+    Wandelt einen eingelesenen CSV-DataFrame in typisierte Spalten um
+
+    Args:
+        df: pandas DataFrame mit den Spalten Date, SYS, DIA, BPM
+
+    Returns:
+        Dictionary mit numpy Arrays: 'timestamp' (Epoch-Mikrosekunden, UTC),
+        'utc_offset' (Sekunden), 'sys', 'dia', 'pulse'
+    """
+    if len(df) == 0:
+        return _empty_columns()
+
+    timestamps, utc_offsets = _parse_iso_timestamps(df['Date'])
+    return {
+        'timestamp': timestamps,
+        'utc_offset': utc_offsets,
+        'sys': df['SYS'].to_numpy(dtype=np.int16),
+        'dia': df['DIA'].to_numpy(dtype=np.int16),
+        'pulse': df['BPM'].to_numpy(dtype=np.int16)
+    }
+
+
+def _filter_columns(columns, start_time=None, end_time=None):
+    """
+    Wendet das Zeitraum-Prädikat auf die Spalten-Arrays an
+
+    Args:
+        columns: Dictionary mit numpy Arrays (siehe _parse_csv_frame)
+        start_time: Untere Grenze (inklusive) oder None
+        end_time: Obere Grenze (inklusive) oder None
+
+    Returns:
+        Dictionary mit den ausgewählten Zeilen
+    """
+    if start_time is None and end_time is None:
+        return columns
+
+    mask = np.ones(len(columns['timestamp']), dtype=bool)
+    if start_time is not None:
+        mask &= columns['timestamp'] >= datetime_to_epoch_us(start_time)
+    if end_time is not None:
+        mask &= columns['timestamp'] <= datetime_to_epoch_us(end_time)
+
+    return {name: values[mask] for name, values in columns.items()}
+
+
+def _slice_sorted_columns(columns, start_time=None, end_time=None):
+    """
+    Wählt den Zeitraum aus zeitlich sortierten Spalten per Binärsuche aus
+
+    Liefert Views ohne Kopie (bei Memory-Maps werden nur die benötigten
+    Seiten gelesen).
+    """
+    start_us = datetime_to_epoch_us(start_time) if start_time else None
+    end_us = datetime_to_epoch_us(end_time) if end_time else None
+    lower, upper = time_range_bounds(columns['timestamp'], start_us, end_us)
+    return {name: values[lower:upper] for name, values in columns.items()}
+
+
+def _sort_columns(columns):
+    """Sortiert Spalten-Arrays zeitlich (stabil), falls sie nicht bereits sortiert sind"""
+    if is_sorted_array(columns['timestamp']):
+        return columns
+    order = np.argsort(columns['timestamp'], kind='stable')
+    return {name: values[order] for name, values in columns.items()}
+
+
+def _concat_columns(parts):
+    """Hängt mehrere Spalten-Dictionaries aneinander"""
+    if len(parts) == 1:
+        return parts[0]
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def read_csv_columns(csv_file, start_time=None, end_time=None, chunk_size=None):
+    """
+    Liest eine CSV-Datei (Date,SYS,DIA,BPM) spaltenweise ein
+
+    Ohne chunk_size wird die Datei in einem Durchgang gelesen. Mit chunk_size
+    wird sie blockweise gelesen und der Zeitraum bereits beim Lesen angewendet,
+    sodass der Speicherbedarf nur vom gewählten Zeitraum (plus einem Block)
+    abhängt. Ist die Datei zeitlich sortiert, endet das Lesen, sobald ein
+    Block vollständig hinter end_time liegt.
+
+    Args:
+        csv_file: Pfad zur CSV-Datei
+        start_time: Optionaler Startzeitpunkt (datetime)
+        end_time: Optionaler Endzeitpunkt (datetime)
+        chunk_size: Optionale Anzahl Zeilen pro Block
+
+    Returns:
+        Dictionary mit numpy Arrays (siehe _parse_csv_frame)
+    """
+    pd = lazy_import('pandas')
+    if not chunk_size:
+        df = pd.read_csv(csv_file, usecols=CSV_COLUMNS, dtype=CSV_DTYPES, engine='c')
+        return _filter_columns(_parse_csv_frame(df), start_time, end_time)
+
+    end_us = datetime_to_epoch_us(end_time) if end_time else None
+
+    parts = []
+    is_sorted = True
+    previous_last = None
+
+    with pd.read_csv(csv_file, usecols=CSV_COLUMNS, dtype=CSV_DTYPES, engine='c',
+                     chunksize=chunk_size) as reader:
+        for df in reader:
+            columns = _parse_csv_frame(df)
+            timestamps = columns['timestamp']
+            if len(timestamps) == 0:
+                continue
+
+            # Sortierung über Blockgrenzen hinweg verfolgen
+            if is_sorted:
+                is_sorted = is_sorted_array(timestamps) and \
+                    (previous_last is None or timestamps[0] >= previous_last)
+                previous_last = timestamps[-1]
+
+            selected = _filter_columns(columns, start_time, end_time)
+            if len(selected['timestamp']):
+                parts.append(selected)
+
+            if is_sorted and end_us is not None and timestamps[-1] > end_us:
+                break
 
-# Optionaler Import für Withings API
-try:
-    from withings_client import WithingsClient
-    WITHINGS_AVAILABLE = True
-except ImportError:
-    WITHINGS_AVAILABLE = False
-    WithingsClient = None
+    if not parts:
+        return _empty_columns()
+    return _concat_columns(parts)
+
+
+# Version des Cache-Formats (bei Änderungen am Spaltenlayout erhöhen)
+# Version 2: Spalten werden zeitlich sortiert gespeichert
+CACHE_VERSION = 2
+CACHE_COLUMNS = ['timestamp', 'utc_offset', 'sys', 'dia', 'pulse']
+
+
+def get_cache_dir(csv_file):
+    """Liefert das Cache-Verzeichnis neben der CSV-Datei (<name>.cache)"""
+    csv_path = Path(csv_file)
+    return csv_path.with_name(csv_path.name + '.cache')
+
+
+def _file_sha256(path):
+    """Berechnet den SHA-256 Hash einer Datei blockweise"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_key(csv_file):
+    """Ermittelt Pfad, Größe und Änderungszeit der CSV-Datei"""
+    stat = os.stat(csv_file)
+    return {
+        'path': str(Path(csv_file).resolve()),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns
+    }
+
+
+def load_cached_columns(csv_file):
+    """
+    Lädt die Spalten-Arrays aus dem Binär-Cache (memory-mapped)
+
+    Der Cache ist gültig, wenn Pfad, Größe und Änderungszeit der CSV-Datei
+    übereinstimmen. Weichen nur Größe oder Änderungszeit ab, entscheidet
+    der Inhalts-Hash; bei gleichem Inhalt werden die Metadaten aktualisiert.
+
+    Args:
+        csv_file: Pfad zur CSV-Datei
+
+    Returns:
+        Dictionary mit read-only memory-mapped numpy Arrays oder None
+    """
+    cache_dir = get_cache_dir(csv_file)
+    meta_file = cache_dir / 'meta.json'
+    if not meta_file.exists():
+        return None
+
+    try:
+        with open(meta_file, 'r') as f:
+            meta = json.load(f)
+
+        source = _source_key(csv_file)
+        if meta.get('version') != CACHE_VERSION or meta.get('path') != source['path']:
+            return None
+
+        if meta.get('size') != source['size'] or meta.get('mtime_ns') != source['mtime_ns']:
+            if meta.get('size') != source['size'] or meta.get('sha256') != _file_sha256(csv_file):
+                return None
+            meta.update(source)
+            _write_json_atomic(meta_file, meta)
+
+        return {
+            name: np.load(cache_dir / f'{name}.npy', mmap_mode='r')
+            for name in CACHE_COLUMNS
+        }
+    except (OSError, ValueError) as e:
+        print(f"Cache nicht lesbar, lese CSV-Datei neu: {e}")
+        return None
+
+
+def _write_json_atomic(path, data):
+    """Schreibt eine JSON-Datei atomar über eine temporäre Datei"""
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def save_cached_columns(csv_file, columns, source=None):
+    """
+    Speichert die (zeitlich sortierten) Spalten-Arrays als .npy Dateien neben der CSV-Datei
+
+    Die Spaltendateien werden atomar ersetzt, meta.json wird zuletzt
+    geschrieben. Laufende Prozesse mit geöffneten Memory-Maps behalten
+    so ihre bisherigen Daten.
+
+    Args:
+        csv_file: Pfad zur CSV-Datei
+        columns: Dictionary mit numpy Arrays (siehe _parse_csv_frame)
+        source: Pfad, Größe und Änderungszeit vor dem Einlesen (siehe _source_key);
+            wurde die Datei seitdem geändert, wird kein Cache geschrieben
+    """
+    cache_dir = get_cache_dir(csv_file)
+    try:
+        source = source or _source_key(csv_file)
+        sha256 = _file_sha256(csv_file)
+        # Hash erst nach dem Einlesen: nur gültig, wenn die Datei unverändert ist
+        if _source_key(csv_file) != source:
+            print(f"CSV-Datei wurde während des Einlesens geändert, Cache wird nicht geschrieben: {csv_file}")
+            return
+        cache_dir.mkdir(exist_ok=True)
+
+        for name in CACHE_COLUMNS:
+            tmp_path = cache_dir / f'{name}.{os.getpid()}.tmp.npy'
+            np.save(tmp_path, np.ascontiguousarray(columns[name]))
+            os.replace(tmp_path, cache_dir / f'{name}.npy')
+
+        meta = dict(source, version=CACHE_VERSION, sha256=sha256, rows=len(columns['timestamp']))
+        _write_json_atomic(cache_dir / 'meta.json', meta)
+    except OSError as e:
+        print(f"Cache konnte nicht geschrieben werden: {e}")
+
+
+def load_csv_file(csv_file, start_time=None, end_time=None, chunk_size=None, use_cache=True):
+    """
+    Lädt eine CSV-Datei als zeitlich sortierte Spalten-Arrays
+
+    Nutzt den Binär-Cache, falls vorhanden. Ohne Cache wird die Datei
+    vollständig gelesen und gecacht bzw. bei chunk_size blockweise gelesen.
+    Als Funktion auf Modulebene kann sie direkt in einem Prozess-Pool
+    ausgeführt werden.
+
+    Args:
+        csv_file: Pfad zur CSV-Datei
+        start_time: Optionaler Startzeitpunkt (datetime)
+        end_time: Optionaler Endzeitpunkt (datetime)
+        chunk_size: Optionale Anzahl Zeilen pro Block
+        use_cache: Binär-Cache lesen und schreiben
+
+    Returns:
+        Dictionary mit numpy Arrays (siehe _parse_csv_frame)
+    """
+    columns = load_cached_columns(csv_file) if use_cache else None
+
+    if columns is not None:
+        # Der Cache ist sortiert: Zeitraum per Binärsuche als View
+        print(f"Verwende Cache: {get_cache_dir(csv_file)}")
+        return _slice_sorted_columns(columns, start_time, end_time)
+
+    if use_cache and not chunk_size:
+        # Vollständig einlesen, sortiert cachen und danach den Zeitraum auswählen
+        source = _source_key(csv_file)
+        columns = _sort_columns(read_csv_columns(csv_file))
+        save_cached_columns(csv_file, columns, source)
+        return _slice_sorted_columns(columns, start_time, end_time)
+
+    # Blockweises Lesen liefert nur den Zeitraum, daher kein Cache
+    return _sort_columns(read_csv_columns(csv_file, start_time, end_time, chunk_size))
+
+
+def _merge_two_columns(left, right):
+    """
+    Mischt zwei zeitlich sortierte Spalten-Dictionaries (stabil)
+
+    Die Zielpositionen der rechten Zeilen werden per Binärsuche bestimmt,
+    die linken Zeilen füllen die verbleibenden Positionen.
+    """
+    count = len(left['timestamp']) + len(right['timestamp'])
+    right_positions = np.searchsorted(left['timestamp'], right['timestamp'], side='right')
+    right_positions += np.arange(len(right['timestamp']))
+    left_mask = np.ones(count, dtype=bool)
+    left_mask[right_positions] = False
+
+    merged = {}
+    for name in left:
+        values = np.empty(count, dtype=left[name].dtype)
+        values[right_positions] = right[name]
+        values[left_mask] = left[name]
+        merged[name] = values
+    return merged
+
+
+def merge_sorted_columns(parts):
+    """
+    K-Wege-Merge mehrerer zeitlich sortierter Spalten-Dictionaries
+
+    Überschneiden sich die Zeiträume nicht (z.B. ein Export pro Monat),
+    werden die Teile nur in zeitlicher Reihenfolge aneinandergehängt.
+    Sonst wird paarweise in einem balancierten Baum gemischt
+    (O(n log k) statt vollständigem Neusortieren).
+
+    Args:
+        parts: Liste von Spalten-Dictionaries, jeweils sortiert
+
+    Returns:
+        Dictionary mit den gemischten Spalten
+    """
+    parts = [part for part in parts if len(part['timestamp'])]
+    if not parts:
+        return _empty_columns()
+
+    parts.sort(key=lambda part: part['timestamp'][0])
+    if all(current['timestamp'][0] >= previous['timestamp'][-1]
+           for previous, current in zip(parts, parts[1:])):
+        return _concat_columns(parts)
+
+    while len(parts) > 1:
+        merged = [_merge_two_columns(left, right) for left, right in zip(parts[::2], parts[1::2])]
+        if len(parts) % 2:
+            merged.append(parts[-1])
+        parts = merged
+    return parts[0]
+
+
+def expand_csv_paths(patterns):
+    """
+    Erweitert Dateien, Glob-Muster und Verzeichnisse zu einer Liste von CSV-Dateien
+
+    Args:
+        patterns: Liste von Pfaden, Glob-Mustern (z.B. 'exports/*.csv') oder Verzeichnissen
+
+    Returns:
+        Liste der gefundenen CSV-Dateien (ohne Duplikate, Reihenfolge erhalten)
+    """
+    paths = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            paths.extend(sorted(str(p) for p in path.glob('*.csv')))
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern)))
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+
+def parse_time_window(value):
+    """
+    Parst ein Zeitfenster im Format HH:MM-HH:MM
+
+    Das Ende ist inklusive, '24:00' steht für das Tagesende.
+
+    Args:
+        value: String, z.B. '04:00-12:00'
+
+    Returns:
+        Tuple (Beginn, Ende) als datetime.time
+
+    Raises:
+        ValueError: Bei ungültigem Format oder Ende vor Beginn
+    """
+    start_str, end_str = value.split('-')
+    start = time.fromisoformat(start_str.strip())
+    end = time.max if end_str.strip() == '24:00' else time.fromisoformat(end_str.strip())
+    if end < start:
+        raise ValueError(f"Ende vor Beginn: {value}")
+    return start, end
+
+
+def parse_rolling_windows(value):
+    """
+    Parst Fensterlängen in Tagen, z.B. '7,30,90'
+
+    Args:
+        value: String mit kommagetrennten Tagen oder 'none' für keine Fenster
+
+    Returns:
+        Tuple der Fensterlängen, aufsteigend
+
+    Raises:
+        ValueError: Bei ungültigem Format oder Fensterlänge kleiner 1
+    """
+    if value.strip().lower() in ('', 'none'):
+        return ()
+    windows = sorted({int(part) for part in value.split(',')})
+    if windows[0] < 1:
+        raise ValueError(f"Fensterlänge kleiner 1: {value}")
+    return tuple(windows)
+
+
+def parse_time_argument(value):
+    """
+    Parst einen Zeitpunkt wie bei --start/--end ('YYYY-MM-DD HH:MM:SS' oder ISO 8601)
+
+    Args:
+        value: String; ohne Zeitzone wird die lokale Zeitzone angenommen
+
+    Returns:
+        datetime mit Zeitzone
+
+    Raises:
+        ValueError: Bei ungültigem Format
+    """
+    parsed = datetime.fromisoformat(value.strip().replace(' ', 'T'))
+    # Wenn keine Zeitzone angegeben, verwende lokale Zeitzone
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=LOCAL_TZ)
+    return parsed
+
+
+# Verzeichnis des Render-Caches für einzelne PDF-Seiten
+RENDER_CACHE_DIR = 'bloodpressure.pdf.cache'
+
+# Ausgabedateien des Berichts
+PDF_REPORT_FILE = 'bloodpressure.pdf'
+COMPLETE_SVG_FILE = 'bloodpressure_complete.svg'
+
+# Lokaler Speicher für Withings-Messungen (inkrementeller Abgleich)
+WITHINGS_STORE_FILE = 'withings_measurements.sqlite'
+
+# Analyzer-Kopie im Render-Prozess (gesetzt durch _init_render_worker)
+_render_analyzer = None
+
+
+def _init_render_worker(analyzer):
+    """Übergibt die Daten einmalig pro Render-Prozess statt pro Auftrag"""
+    global _render_analyzer
+    stop_tracing()
+    _render_analyzer = analyzer
+
+
+def _render_pdf_fragment(method_name, args, analyzer=None):
+    """
+    Rendert einen Auftrag als eigenständiges PDF-Fragment
+
+    Args:
+        method_name: Name der Render-Methode des Analyzers (Signatur: pdf, *args)
+        args: Zusätzliche Argumente der Methode
+        analyzer: Analyzer (Standard: Kopie im Render-Prozess)
+
+    Returns:
+        PDF-Dokument als bytes
+    """
+    buffer = io.BytesIO()
+    pdf = lazy_import('matplotlib.backends.backend_pdf').PdfPages(buffer)
+    try:
+        getattr(analyzer or _render_analyzer, method_name)(pdf, *args)
+    finally:
+        pdf.close()
+        lazy_import('matplotlib.pyplot').close('all')
+    return buffer.getvalue()
+
+
+def assemble_pdf_fragments(fragments, output_file):
+    """
+    Fügt PDF-Fragmente in der angegebenen Reihenfolge zu einer Datei zusammen
+
+    Args:
+        fragments: Liste von PDF-Dokumenten als bytes
+        output_file: Zieldatei oder binärer Stream
+
+    Returns:
+        Anzahl Seiten
+    """
+    pypdf = lazy_import('pypdf')
+    writer = pypdf.PdfWriter()
+    for fragment in fragments:
+        writer.append(pypdf.PdfReader(io.BytesIO(fragment)))
+    # Gleiche Objekte (z.B. Schriften) aus den Fragmenten nur einmal speichern
+    if hasattr(writer, 'compress_identical_objects'):  # ab pypdf 4.3
+        writer.compress_identical_objects()
+    if hasattr(output_file, 'write'):
+        writer.write(output_file)
+    else:
+        with open(output_file, 'wb') as f:
+            writer.write(f)
+    return len(writer.pages)
 
 
 class BloodPressureAnalyzer:
-    def __init__(self, csv_file=None, start_time=None, end_time=None, use_withings=False):
+    def __init__(self, csv_file=None, start_time=None, end_time=None, use_withings=False, chunk_size=None,
+                 use_cache=True, workers=None, morning_window=DEFAULT_MORNING_WINDOW,
+                 evening_window=DEFAULT_EVENING_WINDOW, profiler=None, render_workers=None,
+                 full_resolution=False, render_cache=False, withings_workers=None,
+                 withings_check=False, withings_api_url=None, withings_record=None,
+                 rolling_windows=DEFAULT_WINDOWS, use_store=True):
+        # csv_file kann ein einzelner Pfad oder eine Liste von Pfaden sein
         self.csv_file = csv_file
+        if isinstance(csv_file, (list, tuple)):
+            self.csv_files = list(csv_file)
+        else:
+            self.csv_files = [csv_file] if csv_file else []
+        self.workers = workers
+        self.render_workers = render_workers
+        self.full_resolution = full_resolution
+        # Fensterlängen (Tage) der gleitenden Statistiken im Gesamtdiagramm (leer: keine)
+        self.rolling_windows = tuple(rolling_windows or ())
+        self.render_cache = render_cache
+        self.withings_workers = withings_workers
+        self.withings_check = withings_check
+        self.withings_api_url = withings_api_url
+        self.withings_record = withings_record
+        # Lokalen Withings-Speicher vor dem Lesen mit der API abgleichen
+        self.withings_sync = True
+        # Gesamtdiagramm zusätzlich als SVG-Datei speichern (None: keine Datei)
+        self.complete_svg_file = COMPLETE_SVG_FILE
         self.start_time = start_time
         self.end_time = end_time
         self.use_withings = use_withings
+        self.chunk_size = chunk_size
+        self.use_cache = use_cache
+        # Withings: lokalen Speicher abgleichen statt den Zeitraum direkt abzurufen
+        self.use_store = use_store
+        self.morning_window = morning_window
+        self.evening_window = evening_window
+        self.profiler = profiler or PipelineProfiler(enabled=False)
         self.withings_client = None
-        self.bloodpressure_complete = []
-        self.bloodpressure_morning = []
-        self.bloodpressure_evening = []
+        # Wiederverwendbare Seitenvorlagen (Figure und Artists werden einmal angelegt)
+        self._page_templates = {}
+        self.bloodpressure_complete = MeasurementSeries.empty()
+        self.bloodpressure_morning = MeasurementSeries.empty()
+        self.bloodpressure_evening = MeasurementSeries.empty()
         
         # Initialisiere Withings Client falls gewünscht
         if self.use_withings:
@@ -116,25 +786,30 @@ class BloodPressureAnalyzer:
             return False
         
         try:
-            import json
             with open(credentials_file, 'r') as f:
                 creds = json.load(f)
             
+            WithingsClient = lazy_import('withings_client').WithingsClient
             self.withings_client = WithingsClient(
                 creds['client_id'],
                 creds['client_secret'],
-                creds.get('redirect_uri', 'http://localhost:8080/callback')
+                creds.get('redirect_uri', 'http://localhost:8080/callback'),
+                download_workers=self.withings_workers or 1,
+                api_base_url=self.withings_api_url or creds.get('api_base_url'),
+                record_file=self.withings_record
             )
             
-            # Teste Verbindung
-            if not self.withings_client.test_connection():
-                print("Withings API Autorisierung erforderlich...")
-                if not self.withings_client.authorize():
-                    print("Withings Autorisierung fehlgeschlagen!")
-                    self.withings_client = None
-                    return False
+            # Gültigem Token vertrauen; Prüfung beim ersten Abruf (oder sofort mit --withings-check)
+            if not self.withings_client.connect(validate=self.withings_check):
+                print("Withings Autorisierung fehlgeschlagen!")
+                self.withings_client = None
+                return False
             
-            print("Withings API erfolgreich verbunden!")
+            if self.withings_check:
+                print("Withings API erfolgreich verbunden!")
+            else:
+                print("Withings API bereit (Token wird beim ersten Abruf geprüft)")
+                self._print_withings_devices()
             return True
             
         except Exception as e:
@@ -142,31 +817,35 @@ class BloodPressureAnalyzer:
             self.withings_client = None
             return False
     
+    def _print_withings_devices(self):
+        """Zeigt die Geräte aus dem Geräte-Cache (API-Abruf höchstens einmal je Cache-Gültigkeit)"""
+        try:
+            self.withings_client.print_devices(self.withings_client.get_devices())
+        except Exception as e:
+            print(f"Hinweis: Geräteliste nicht verfügbar ({e})")
+    
     def load_data(self):
         """Lädt die Daten aus CSV-Datei oder Withings API"""
         if self.use_withings and self.withings_client:
             self._load_data_from_withings()
-        elif self.csv_file:
+        elif self.csv_files:
             self._load_data_from_csv()
         else:
             print("Fehler: Weder CSV-Datei noch Withings API verfügbar!")
     
     def _load_data_from_csv(self):
-        """Lädt die Daten aus der CSV-Datei"""
-        with open(self.csv_file, 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                timestamp = datetime.fromisoformat(row['Date'])
-                sys_bp = int(row['SYS'])
-                dia_bp = int(row['DIA'])
-                pulse = int(row['BPM'])
-                
-                self.bloodpressure_complete.append({
-                    'timestamp': timestamp,
-                    'sys': sys_bp,
-                    'dia': dia_bp,
-                    'pulse': pulse
-                })
+        """Lädt die Daten aus einer oder mehreren CSV-Dateien (parallel bei mehreren Dateien)"""
+        load_args = (self.start_time, self.end_time, self.chunk_size, self.use_cache)
+        
+        if len(self.csv_files) > 1 and self.workers != 1:
+            print(f"Lade {len(self.csv_files)} CSV-Dateien parallel...")
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=stop_tracing) as executor:
+                futures = [executor.submit(load_csv_file, csv_file, *load_args) for csv_file in self.csv_files]
+                parts = [future.result() for future in futures]
+        else:
+            parts = [load_csv_file(csv_file, *load_args) for csv_file in self.csv_files]
+        
+        self.bloodpressure_complete = MeasurementSeries.from_columns(merge_sorted_columns(parts), is_sorted=True)
     
     def _load_data_from_withings(self):
         """Lädt die Daten von der Withings API"""
@@ -175,92 +854,220 @@ class BloodPressureAnalyzer:
             return
         
         print(f"Lade Blutdruckdaten von Withings API (Zeitraum: {self.start_time.strftime('%Y-%m-%d %H:%M:%S')} bis {self.end_time.strftime('%Y-%m-%d %H:%M:%S')})...")
+        if self.use_store:
+            self._load_data_from_withings_store()
+            return
+        
         data = self.withings_client.get_blood_pressure_data(self.start_time, self.end_time)
         
         if data:
-            self.bloodpressure_complete = data
+            self.bloodpressure_complete = MeasurementSeries.from_entries(data)
             print(f"Erfolgreich {len(data)} Messungen von Withings geladen!")
         else:
             print("Keine Blutdruckdaten von Withings API erhalten.")
     
+    def _load_data_from_withings_store(self):
+        """Gleicht den lokalen Withings-Speicher inkrementell ab und liest den Zeitraum daraus"""
+        with MeasurementStore(WITHINGS_STORE_FILE) as store:
+            if self.withings_sync and not self.withings_client.sync_measurements(store, self.start_time):
+                print(f"Warnung: Abgleich fehlgeschlagen, verwende vorhandene Daten aus {WITHINGS_STORE_FILE}")
+            self.bloodpressure_complete = store.load_range(datetime_to_epoch_us(self.start_time),
+                                                           datetime_to_epoch_us(self.end_time))
+        
+        if len(self.bloodpressure_complete):
+            print(f"Erfolgreich {len(self.bloodpressure_complete)} Messungen von Withings geladen!")
+        else:
+            print("Keine Blutdruckdaten von Withings API erhalten.")
+    
     def sort_data(self):
-        """Sortiert die Daten nach Zeitstempel"""
-        self.bloodpressure_complete.sort(key=lambda x: x['timestamp'])
+        """Sortiert die Daten nach Zeitstempel (entfällt bei bereits sortierten Daten)"""
+        self.bloodpressure_complete = self.bloodpressure_complete.sorted()
     
     def filter_by_time_range(self):
-        """Filtert die Daten basierend auf Start- und Endzeitpunkt"""
-        if self.start_time:
-            self.bloodpressure_complete = [
-                entry for entry in self.bloodpressure_complete 
-                if entry['timestamp'] >= self.start_time
-            ]
-        
-        if self.end_time:
-            self.bloodpressure_complete = [
-                entry for entry in self.bloodpressure_complete 
-                if entry['timestamp'] <= self.end_time
-            ]
+        """Filtert die Daten basierend auf Start- und Endzeitpunkt (Binärsuche auf sortierten Daten)"""
+        start_us = datetime_to_epoch_us(self.start_time) if self.start_time else None
+        end_us = datetime_to_epoch_us(self.end_time) if self.end_time else None
+        self.bloodpressure_complete = self.bloodpressure_complete.time_range(start_us, end_us)
+    
+    def create_morning_evening_data(self):
+        """Erstellt Morgen- und Abenddaten in einem gemeinsamen vektorisierten Durchgang"""
+        self.bloodpressure_morning, self.bloodpressure_evening = select_morning_evening(
+            self.bloodpressure_complete, self.morning_window, self.evening_window)
     
     def create_morning_data(self):
-        """Erstellt Liste mit ersten Blutdruckwerten des Tages (4:00-12:00)"""
-        daily_data = defaultdict(list)
-        
-        # Gruppiere Daten nach Datum
-        for entry in self.bloodpressure_complete:
-            date = entry['timestamp'].date()
-            daily_data[date].append(entry)
-        
-        # Finde ersten Wert des Tages zwischen 4:00 und 12:00
-        for date, entries in daily_data.items():
-            entries.sort(key=lambda x: x['timestamp'])
-            for entry in entries:
-                entry_time = entry['timestamp'].time()
-                if time(4, 0) <= entry_time <= time(12, 0):
-                    self.bloodpressure_morning.append(entry)
-                    break
+        """Erstellt Serie mit ersten Blutdruckwerten des Tages im Morgenfenster (Standard 4:00-12:00)"""
+        data = self.bloodpressure_complete.sorted()
+        day, time_of_day = data.local_day_and_time()
+        self.bloodpressure_morning = data[select_per_day(day, time_of_day, self.morning_window)]
     
     def create_evening_data(self):
-        """Erstellt Liste mit letzten Blutdruckwerten des Tages (nach 18:00)"""
-        daily_data = defaultdict(list)
-        
-        # Gruppiere Daten nach Datum
-        for entry in self.bloodpressure_complete:
-            date = entry['timestamp'].date()
-            daily_data[date].append(entry)
-        
-        # Finde letzten Wert des Tages nach 18:00
-        for date, entries in daily_data.items():
-            entries.sort(key=lambda x: x['timestamp'], reverse=True)
-            for entry in entries:
-                entry_time = entry['timestamp'].time()
-                if entry_time >= time(18, 0):
-                    self.bloodpressure_evening.append(entry)
-                    break
+        """Erstellt Serie mit letzten Blutdruckwerten des Tages im Abendfenster (Standard ab 18:00)"""
+        data = self.bloodpressure_complete.sorted()
+        day, time_of_day = data.local_day_and_time()
+        self.bloodpressure_evening = data[select_per_day(day, time_of_day, self.evening_window, last=True)]
     
+    def _pdf_render_jobs(self, table_jobs=1):
+        """
+        Liste der Render-Aufträge in Seitenreihenfolge
 
-    
+        Args:
+            table_jobs: Anzahl Aufträge, auf die die Tabellenseiten verteilt werden
 
+        Returns:
+            Liste von Tupeln (Profiler-Schritt, Methodenname, Argumente, Angaben zum Schritt)
+        """
+        rows_per_page = lazy_import('pdf_table_renderer').ROWS_PER_PAGE
+        total_pages = max(1, (len(self.bloodpressure_complete) + rows_per_page - 1) // rows_per_page)
+        jobs = [
+            ('pdf.title_page', 'create_title_page', (), {}),
+            ('pdf.chart_complete', '_create_complete_chart_for_pdf', (),
+             {'points': len(self.bloodpressure_complete)}),
+            ('pdf.chart_morning_evening', '_create_morning_evening_chart_for_pdf', (), {}),
+            ('pdf.chart_average', '_create_average_chart_for_pdf', (), {})
+        ]
+        pages_per_job = (total_pages + table_jobs - 1) // table_jobs
+        for first_page in range(0, total_pages, pages_per_job):
+            last_page = min(first_page + pages_per_job, total_pages)
+            jobs.append(('pdf.table_pages', 'add_data_table_to_pdf', (first_page, last_page),
+                         {'pages': last_page - first_page}))
+        return jobs
     
-    def create_pdf_report(self):
-        """Erstellt den PDF-Bericht"""
-        with PdfPages('bloodpressure.pdf') as pdf:
-            # Startseite
-            self.create_title_page(pdf)
-            
-            # Diagramme direkt erstellen (DIN A4 Querformat für alle) und SVGs parallel generieren
-            self._create_chart_for_pdf(pdf, self.bloodpressure_complete, 'Alle Blutdruckdaten', 'bloodpressure_complete.svg')
-            
-            # Morgen-Abend-Vergleichsdiagramm
-            self._create_morning_evening_chart_for_pdf(pdf)
-            
-            # Durchschnittsdiagramm
-            self._create_average_chart_for_pdf(pdf)
-            
-            # Tabelle
-            self.add_data_table_to_pdf(pdf)
+    def create_pdf_report(self, output_file=PDF_REPORT_FILE):
+        """
+        Erstellt den PDF-Bericht
+        
+        Mit render_workers > 1 werden die Seiten parallel erstellt, mit render_cache
+        werden unveränderte Seiten aus dem Render-Cache übernommen.
+        
+        Args:
+            output_file: Zieldatei oder binärer Stream (z.B. io.BytesIO)
+        """
+        if (self.render_workers and self.render_workers > 1) or self.render_cache:
+            if PYPDF_AVAILABLE:
+                self._create_pdf_report_from_fragments(output_file)
+                return
+            print("Hinweis: pypdf nicht installiert - PDF-Seiten werden nacheinander und ohne Cache erstellt.")
+        
+        profiler = self.profiler
+        pdf = lazy_import('matplotlib.backends.backend_pdf').PdfPages(output_file)
+        try:
+            # Startseite, Diagramme (DIN A4 Querformat, Gesamtdiagramm zusätzlich als SVG) und Tabelle
+            for stage, method_name, args, stage_info in self._pdf_render_jobs():
+                with profiler.stage(stage) as info:
+                    info.update(stage_info)
+                    getattr(self, method_name)(pdf, *args)
+        finally:
+            # Abschließendes Schreiben der PDF-Datei
+            with profiler.stage('pdf.write'):
+                pdf.close()
+    
+    def _render_cache_keys(self, jobs):
+        """
+        Inhalts-Schlüssel je Render-Auftrag aus den Daten der Seite(n) und allen Render-Parametern
+        
+        Args:
+            jobs: Render-Aufträge aus _pdf_render_jobs()
+        
+        Returns:
+            Liste von Schlüsseln in Auftragsreihenfolge
+        """
+        data = self.bloodpressure_complete
+        rows_per_page = lazy_import('pdf_table_renderer').ROWS_PER_PAGE
+        params = (lazy_import('matplotlib').__version__, rows_per_page, self.full_resolution,
+                  self.morning_window, self.evening_window)
+        
+        # Titelseite und Diagramme hängen vom gesamten Datenbestand ab
+        report_key = RenderCache.key(params, str(self.start_time), str(self.end_time),
+                                     *data.columns().values(), self.bloodpressure_morning.timestamp,
+                                     self.bloodpressure_evening.timestamp)
+        
+        row_colors = self._table_row_colors(data)
+        total_pages = (len(data) + rows_per_page - 1) // rows_per_page
+        keys = []
+        for _, method_name, args, _ in jobs:
+            if method_name == '_create_complete_chart_for_pdf':
+                # Gleitende Statistiken erscheinen nur im Gesamtdiagramm
+                keys.append(RenderCache.key(report_key, method_name, self.rolling_windows))
+                continue
+            if method_name != 'add_data_table_to_pdf':
+                keys.append(RenderCache.key(report_key, method_name))
+                continue
+            # Tabellenseiten hängen nur von ihren Zeilen ab (und davon, ob die Legende erscheint)
+            first_page, last_page = args
+            rows = slice(first_page * rows_per_page, last_page * rows_per_page)
+            keys.append(RenderCache.key(params, method_name, last_page - first_page, last_page == total_pages,
+                                        *data[rows].columns().values(), row_colors[rows]))
+        return keys
+    
+    def _create_pdf_report_from_fragments(self, output_file=PDF_REPORT_FILE):
+        """
+        Erstellt den Bericht aus einzeln gerenderten PDF-Fragmenten
+        
+        Fehlende Fragmente werden mit render_workers > 1 in einem Prozess-Pool
+        gerendert, sonst nacheinander. Mit render_cache wird jede Tabellenseite
+        als eigenes Fragment unter ihrem Inhalts-Schlüssel gespeichert, sodass
+        bei erneuter Erstellung nur geänderte Seiten gerendert werden. Die
+        Fragmente werden in der ursprünglichen Reihenfolge zu output_file
+        zusammengefügt.
+        """
+        profiler = self.profiler
+        workers = self.render_workers if self.render_workers and self.render_workers > 1 else 1
+        
+        # Mit Cache eine Tabellenseite je Auftrag, sonst etwa 4 Aufträge je Prozess (Lastverteilung)
+        if self.render_cache:
+            rows_per_page = lazy_import('pdf_table_renderer').ROWS_PER_PAGE
+            table_jobs = max(1, (len(self.bloodpressure_complete) + rows_per_page - 1) // rows_per_page)
+        else:
+            table_jobs = workers * 4
+        jobs = self._pdf_render_jobs(table_jobs=table_jobs)
+        fragments = [None] * len(jobs)
+        
+        cache = RenderCache(RENDER_CACHE_DIR) if self.render_cache else None
+        if cache:
+            with profiler.stage('pdf.render_cache_lookup') as info:
+                keys = self._render_cache_keys(jobs)
+                for index, (key, (_, method_name, _, _)) in enumerate(zip(keys, jobs)):
+                    # Gesamtdiagramm neu erstellen, falls die SVG-Datei fehlt
+                    if (method_name == '_create_complete_chart_for_pdf' and self.complete_svg_file
+                            and not Path(self.complete_svg_file).exists()):
+                        continue
+                    fragments[index] = cache.get(key)
+                info['hits'] = cache.hits
+        
+        missing = [index for index, fragment in enumerate(fragments) if fragment is None]
+        with profiler.stage('pdf.render_fragments') as info:
+            info['jobs'] = len(missing)
+            info['workers'] = workers
+            if workers > 1 and len(missing) > 1:
+                # Schlanke Kopie für die Render-Prozesse (ohne API-Client und Profiler)
+                renderer = copy.copy(self)
+                renderer.withings_client = None
+                renderer.profiler = PipelineProfiler(enabled=False)
+                renderer._page_templates = {}
+                
+                print(f"Erstelle {len(missing)} PDF-Teile mit {workers} Prozessen...")
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                                         initargs=(renderer,)) as executor:
+                    futures = [executor.submit(_render_pdf_fragment, jobs[index][1], jobs[index][2])
+                               for index in missing]
+                    for index, future in zip(missing, futures):
+                        fragments[index] = future.result()
+            else:
+                for index in missing:
+                    fragments[index] = _render_pdf_fragment(jobs[index][1], jobs[index][2], self)
+        
+        if cache:
+            for index in missing:
+                cache.put(keys[index], fragments[index])
+            cache.prune(keys)
+            print(f"Render-Cache: {len(jobs) - len(missing)} von {len(jobs)} PDF-Teilen wiederverwendet")
+        
+        with profiler.stage('pdf.write') as info:
+            info['pages'] = assemble_pdf_fragments(fragments, output_file)
     
     def create_title_page(self, pdf):
         """Erstellt die Titelseite"""
+        plt = lazy_import('matplotlib.pyplot')
         fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 Querformat
         ax.axis('off')
         
@@ -269,16 +1076,21 @@ class BloodPressureAnalyzer:
                horizontalalignment='center', verticalalignment='center',
                fontsize=24, fontweight='bold', transform=ax.transAxes)
         
-        # Zeitraum
+        # Zeitraum (ohne Angabe aus den Daten, bei leerem Zeitraum 'keine Daten')
+        data = self.bloodpressure_complete
         if self.start_time:
             start_str = self.start_time.strftime('%d.%m.%Y %H:%M')
+        elif data:
+            start_str = data.datetime_at(0).strftime('%d.%m.%Y %H:%M')
         else:
-            start_str = self.bloodpressure_complete[0]['timestamp'].strftime('%d.%m.%Y %H:%M')
+            start_str = 'keine Daten'
         
         if self.end_time:
             end_str = self.end_time.strftime('%d.%m.%Y %H:%M')
+        elif data:
+            end_str = data.datetime_at(-1).strftime('%d.%m.%Y %H:%M')
         else:
-            end_str = self.bloodpressure_complete[-1]['timestamp'].strftime('%d.%m.%Y %H:%M')
+            end_str = 'keine Daten'
         
         ax.text(0.5, 0.4, f'Zeitraum: {start_str} - {end_str}', 
                horizontalalignment='center', verticalalignment='center',
@@ -287,8 +1099,9 @@ class BloodPressureAnalyzer:
         pdf.savefig(fig, bbox_inches='tight')
         plt.close()
     
-    def _create_chart_for_pdf(self, pdf, data, title, svg_filename=None):
-        """Erstellt ein Liniendiagramm für PDF und optional auch als SVG"""
+    def _create_chart_for_pdf(self, pdf, data, title, svg_filename=None, rolling=None):
+        """Erstellt ein Liniendiagramm für PDF und optional auch als SVG (mit gleitenden Statistiken)"""
+        plt = lazy_import('matplotlib.pyplot')
         if not data:
             print(f"Keine Daten für {title}")
             fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 Querformat
@@ -300,32 +1113,53 @@ class BloodPressureAnalyzer:
             plt.close()
             return
             
-        timestamps = [entry['timestamp'] for entry in data]
-        sys_values = [entry['sys'] for entry in data]
-        dia_values = [entry['dia'] for entry in data]
-        pulse_values = [entry['pulse'] for entry in data]
+        timestamps = data.datetimes
         
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(11.69, 8.27))  # A4 Querformat
         
+        # Detailstufe: bei mehr Messungen als Pixelspalten nur Minimum und Maximum je Spalte zeichnen
+        buckets = None if self.full_resolution else chart_buckets(fig, ax1)
+        series = {}
+        for name in ('sys', 'dia', 'pulse'):
+            values = getattr(data, name)
+            indices = min_max_indices(data.timestamp, values, buckets) if buckets else None
+            if indices is None or len(indices) == len(values):
+                series[name] = (timestamps, values)
+            else:
+                series[name] = (timestamps[indices], values[indices])
+        shown_points = max(len(values) for _, values in series.values())
+        
         # Blutdruckdiagramm
-        ax1.plot(timestamps, sys_values, 'r-', label='Systolisch', linewidth=2)
-        ax1.plot(timestamps, dia_values, 'b-', label='Diastolisch', linewidth=2)
+        ax1.plot(*series['sys'], 'r-', label='Systolisch', linewidth=2)
+        ax1.plot(*series['dia'], 'b-', label='Diastolisch', linewidth=2)
+        
+        # Pulsdiagramm
+        ax2.plot(*series['pulse'], 'g-', label='Puls', linewidth=2)
+        
+        legend_options = {}
+        if rolling is not None and self._plot_rolling_overlays(ax1, ax2, rolling):
+            legend_options = {'fontsize': 8, 'ncol': 2}
+        
         ax1.set_ylabel('Blutdruck (mmHg)', fontsize=12)
         ax1.set_title(title, fontsize=14, fontweight='bold')
-        ax1.legend()
+        ax1.legend(**legend_options)
         ax1.grid(True, alpha=0.3)
         setup_x_axis_with_10_ticks(ax1, timestamps, include_time=True)
         
-        # Pulsdiagramm
-        ax2.plot(timestamps, pulse_values, 'g-', label='Puls', linewidth=2)
         ax2.set_ylabel('Puls (bpm)', fontsize=12)
         ax2.set_xlabel('Datum/Zeit', fontsize=12)
-        ax2.legend()
+        ax2.legend(**legend_options)
         ax2.grid(True, alpha=0.3)
         setup_x_axis_with_10_ticks(ax2, timestamps, include_time=True)
         
         plt.tight_layout()
         
+        # Hinweis im Bericht, wenn die Kurven reduziert dargestellt werden
+        if shown_points < len(data):
+            fig.text(0.99, 0.005, f'Darstellung reduziert: max. {shown_points} von {len(data)} Messungen je Kurve '
+                                  f'(Minimum/Maximum je Pixelspalte, vollständig mit --full-resolution)',
+                     ha='right', va='bottom', fontsize=8, color='gray')
+        
         # Speichere als SVG wenn Dateiname angegeben
         if svg_filename:
             plt.savefig(svg_filename, format='svg', bbox_inches='tight')
@@ -334,35 +1168,77 @@ class BloodPressureAnalyzer:
         pdf.savefig(fig, bbox_inches='tight')
         plt.close()
     
+    def _plot_rolling_overlays(self, ax1, ax2, rolling):
+        """
+        Zeichnet gleitende Mittelwerte je Fenster und das Perzentilband des längsten Fensters
+        
+        Fenster, die länger als der Zeitraum der Daten sind, werden ausgelassen.
+        
+        Args:
+            ax1: Achse des Blutdruckdiagramms
+            ax2: Achse des Pulsdiagramms
+            rolling: RollingStats
+        
+        Returns:
+            True wenn mindestens ein Fenster gezeichnet wurde
+        """
+        windows = [window for window in rolling.windows if window <= len(rolling)]
+        if not windows:
+            return False
+        
+        dates = rolling.dates
+        curves = ((ax1, 'sys', 'maroon', 'Systolisch'), (ax1, 'dia', 'midnightblue', 'Diastolisch'),
+                  (ax2, 'pulse', 'darkgreen', 'Puls'))
+        line_styles = ('-', '--', ':', '-.')
+        for i, window in enumerate(windows):
+            for ax, name, color, label in curves:
+                ax.plot(dates, rolling.stats[window][name]['mean'], color=color, linewidth=2.5, zorder=3,
+                        linestyle=line_styles[i % len(line_styles)], label=f'{label} Ø {window} Tage')
+        
+        # Streuung: Band zwischen kleinstem und größtem Perzentil des längsten Fensters
+        if len(rolling.percentiles) >= 2:
+            window = windows[-1]
+            low, high = min(rolling.percentiles), max(rolling.percentiles)
+            labelled = set()
+            for ax, name, color, _ in curves:
+                entry = rolling.stats[window][name]
+                label = None if ax in labelled else f'{low}.–{high}. Perzentil ({window} Tage)'
+                labelled.add(ax)
+                ax.fill_between(dates, entry[f'p{low}'], entry[f'p{high}'], color=color, alpha=0.25,
+                                linewidth=0, zorder=2.5, label=label)
+        return True
+    
+    def _get_page_template(self, name, factory):
+        """
+        Liefert eine Seitenvorlage, die beim ersten Zugriff mit factory() erzeugt wird
+        
+        Args:
+            name: Name der Vorlage (z.B. 'table')
+            factory: Funktion, die die Vorlage erzeugt
+        """
+        template = self._page_templates.get(name)
+        if template is None:
+            template = self._page_templates[name] = factory()
+        return template
+    
+    def _create_complete_chart_for_pdf(self, pdf):
+        """Erstellt das Diagramm aller Blutdruckdaten für PDF und als SVG (falls complete_svg_file gesetzt)"""
+        rolling = rolling_stats(self.bloodpressure_complete, self.rolling_windows) if self.rolling_windows else None
+        self._create_chart_for_pdf(pdf, self.bloodpressure_complete, 'Alle Blutdruckdaten', self.complete_svg_file,
+                                   rolling)
+    
     def _create_average_chart_for_pdf(self, pdf):
         """Erstellt das Durchschnittsdiagramm direkt für PDF"""
-        datasets = [
-            ('Komplett', self.bloodpressure_complete),
-            ('Morgens', self.bloodpressure_morning),
-            ('Abends', self.bloodpressure_evening)
-        ]
-        
-        categories = []
-        sys_means = []
-        sys_stds = []
-        dia_means = []
-        dia_stds = []
-        pulse_means = []
-        pulse_stds = []
-        
-        for name, data in datasets:
-            if data:
-                categories.append(name)
-                sys_values = [entry['sys'] for entry in data]
-                dia_values = [entry['dia'] for entry in data]
-                pulse_values = [entry['pulse'] for entry in data]
-                
-                sys_means.append(np.mean(sys_values))
-                sys_stds.append(np.std(sys_values))
-                dia_means.append(np.mean(dia_values))
-                dia_stds.append(np.std(dia_values))
-                pulse_means.append(np.mean(pulse_values))
-                pulse_stds.append(np.std(pulse_values))
+        plt = lazy_import('matplotlib.pyplot')
+        stats = self.result().stats()
+        categories = [name for key, name in CATEGORIES if stats[key]]
+        available = [stats[key] for key, _ in CATEGORIES if stats[key]]
+        sys_means = [entry['sys']['mean'] for entry in available]
+        sys_stds = [entry['sys']['std'] for entry in available]
+        dia_means = [entry['dia']['mean'] for entry in available]
+        dia_stds = [entry['dia']['std'] for entry in available]
+        pulse_means = [entry['pulse']['mean'] for entry in available]
+        pulse_stds = [entry['pulse']['std'] for entry in available]
         
         x = np.arange(len(categories))
         width = 0.25
@@ -400,6 +1276,7 @@ class BloodPressureAnalyzer:
     
     def _create_morning_evening_chart_for_pdf(self, pdf):
         """Erstellt das Morgen-Abend-Kombinationsdiagramm direkt für PDF"""
+        plt = lazy_import('matplotlib.pyplot')
         if not self.bloodpressure_morning and not self.bloodpressure_evening:
             fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 Querformat
             ax.text(0.5, 0.5, 'Keine Morgen- oder Abenddaten vorhanden', 
@@ -414,10 +1291,10 @@ class BloodPressureAnalyzer:
         
         # Morgen- und Abenddaten kombinieren für bessere Darstellung
         if self.bloodpressure_morning:
-            morning_timestamps = [entry['timestamp'] for entry in self.bloodpressure_morning]
-            morning_sys = [entry['sys'] for entry in self.bloodpressure_morning]
-            morning_dia = [entry['dia'] for entry in self.bloodpressure_morning]
-            morning_pulse = [entry['pulse'] for entry in self.bloodpressure_morning]
+            morning_timestamps = self.bloodpressure_morning.datetimes
+            morning_sys = self.bloodpressure_morning.sys
+            morning_dia = self.bloodpressure_morning.dia
+            morning_pulse = self.bloodpressure_morning.pulse
             
             # Blutdruckdiagramm - Morgenwerte
             ax1.plot(morning_timestamps, morning_sys, 'r-', marker='o', label='Systolisch (Morgens)', 
@@ -430,10 +1307,10 @@ class BloodPressureAnalyzer:
                     linewidth=2, markersize=6, alpha=0.8)
         
         if self.bloodpressure_evening:
-            evening_timestamps = [entry['timestamp'] for entry in self.bloodpressure_evening]
-            evening_sys = [entry['sys'] for entry in self.bloodpressure_evening]
-            evening_dia = [entry['dia'] for entry in self.bloodpressure_evening]
-            evening_pulse = [entry['pulse'] for entry in self.bloodpressure_evening]
+            evening_timestamps = self.bloodpressure_evening.datetimes
+            evening_sys = self.bloodpressure_evening.sys
+            evening_dia = self.bloodpressure_evening.dia
+            evening_pulse = self.bloodpressure_evening.pulse
             
             # Blutdruckdiagramm - Abendwerte
             ax1.plot(evening_timestamps, evening_sys, 'r--', marker='s', label='Systolisch (Abends)', 
@@ -452,11 +1329,8 @@ class BloodPressureAnalyzer:
         ax1.grid(True, alpha=0.3)
         
         # Sammle alle Zeitstempel für die X-Achsen-Formatierung
-        all_timestamps = []
-        if self.bloodpressure_morning:
-            all_timestamps.extend([entry['timestamp'] for entry in self.bloodpressure_morning])
-        if self.bloodpressure_evening:
-            all_timestamps.extend([entry['timestamp'] for entry in self.bloodpressure_evening])
+        all_timestamps = np.concatenate([self.bloodpressure_morning.datetimes,
+                                         self.bloodpressure_evening.datetimes])
         
         setup_x_axis_with_10_ticks(ax1, all_timestamps, include_time=False)
         
@@ -471,104 +1345,97 @@ class BloodPressureAnalyzer:
         pdf.savefig(fig, bbox_inches='tight')
         plt.close()
     
-    def add_data_table_to_pdf(self, pdf):
-        """Fügt die Datentabelle zur PDF hinzu"""
-        # Erstelle DataFrame für bessere Tabellendarstellung
-        df_data = []
-        for entry in self.bloodpressure_complete:
-            df_data.append({
-                'Zeitstempel': entry['timestamp'].strftime('%d.%m.%Y %H:%M:%S'),
-                'SYS': entry['sys'],
-                'DIA': entry['dia'],
-                'Puls': entry['pulse']
-            })
+    def _table_row_colors(self, data):
+        """Farbmarkierung je Tabellenzeile: Gelb = Morgenwert, Orange = Abendwert"""
+        tables = lazy_import('pdf_table_renderer')
+        is_morning = np.isin(data.timestamp, self.bloodpressure_morning.timestamp)
+        is_evening = np.isin(data.timestamp, self.bloodpressure_evening.timestamp)
+        return np.where(is_morning, tables.MORNING_COLOR, np.where(is_evening, tables.EVENING_COLOR,
+                                                                   tables.DEFAULT_COLOR))
+    
+    def add_data_table_to_pdf(self, pdf, first_page=0, last_page=None):
+        """
+        Fügt die Datentabelle zur PDF hinzu
         
-        # Bestimme Farbmarkierungen
-        morning_timestamps = {entry['timestamp'] for entry in self.bloodpressure_morning}
-        evening_timestamps = {entry['timestamp'] for entry in self.bloodpressure_evening}
+        Args:
+            pdf: PdfPages Objekt
+            first_page: Erste zu erstellende Tabellenseite (für parallele Erstellung)
+            last_page: Seite hinter der letzten zu erstellenden Tabellenseite (None = bis zum Ende)
+        """
+        plt = lazy_import('matplotlib.pyplot')
+        tables = lazy_import('pdf_table_renderer')
+        rows_per_page = tables.ROWS_PER_PAGE
+        all_data = self.bloodpressure_complete
+        total_pages = (len(all_data) + rows_per_page - 1) // rows_per_page
+        if last_page is None:
+            last_page = total_pages
+        offset = first_page * rows_per_page
+        data = all_data[offset:min(last_page, total_pages) * rows_per_page]
         
-        # Erstelle Tabellen-Seiten (max 30 Einträge pro Seite)
-        rows_per_page = 30
-        total_pages = (len(df_data) + rows_per_page - 1) // rows_per_page
+        # Bestimme Farbmarkierungen
+        row_colors = self._table_row_colors(data).tolist()
         
-        for page_num, i in enumerate(range(0, len(df_data), rows_per_page)):
-            fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 Querformat
-            ax.axis('off')
-            
-            # Aktuelle Seitendaten
-            page_data = df_data[i:i+rows_per_page]
-            is_last_page = (page_num == total_pages - 1)
-            
-            # Tabelle erstellen mit fester Anzahl von Zeilen
-            table_data = [['Zeitstempel', 'SYS', 'DIA', 'Puls']]
-            table_data.extend([[row['Zeitstempel'], row['SYS'], row['DIA'], row['Puls']] 
-                              for row in page_data])
-            
-            # Fülle die Tabelle mit leeren Zeilen auf, um immer die gleiche Anzahl von Zeilen zu haben
-            current_data_rows = len(page_data)
-            while len(table_data) - 1 < rows_per_page:  # -1 wegen Header-Zeile
-                table_data.append(['', '', '', ''])
-            
-            # Tabelle positionieren (einheitliche Größe für alle Seiten)
-            table = ax.table(cellText=table_data, loc='upper center', cellLoc='center',
-                           bbox=[0, 0.15, 1, 0.80])  # [x, y, width, height] - einheitlich für alle Seiten
-            
-            table.auto_set_font_size(False)
-            table.set_fontsize(9)
-            table.scale(1.2, 1.5)
-            
-            # Farbmarkierungen nur für echte Datenzeilen
-            for j, entry in enumerate(self.bloodpressure_complete[i:i+rows_per_page], 1):
-                if entry['timestamp'] in morning_timestamps:
-                    for k in range(4):
-                        table[(j, k)].set_facecolor('#FFFF99')  # Helles Gelb
-                elif entry['timestamp'] in evening_timestamps:
-                    for k in range(4):
-                        table[(j, k)].set_facecolor('#FFB366')  # Helles Orange
-            
-            # Entferne Umrandung für leere Zellen
-            for j in range(current_data_rows + 1, rows_per_page + 1):  # +1 wegen Header-Zeile
-                for k in range(4):
-                    table[(j, k)].set_linewidth(0)  # Entferne Umrandung
-                    table[(j, k)].set_facecolor('white')  # Setze Hintergrund auf weiß
-            
-            # Legende nur auf der letzten Seite
-            if is_last_page:
-                ax.text(0.5, 0.08, 'Legende: Gelb = Morgenwerte, Orange = Abendwerte', 
-                       transform=ax.transAxes, fontsize=12, ha='center', va='center',
-                       bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray", alpha=0.8))
-            
-            pdf.savefig(fig, bbox_inches='tight')
-            plt.close()
+        # Erstelle Tabellen-Seiten (max 30 Einträge pro Seite) aus einer gemeinsamen Vorlage,
+        # Legende nur auf der letzten Seite
+        template = self._get_page_template('table', lambda: tables.TablePageTemplate(rows_per_page))
+        for page_num, i in enumerate(range(0, len(data), rows_per_page), first_page):
+            # Aktuelle Seitendaten (View ohne Kopie)
+            page_data = data[i:i+rows_per_page]
+            rows = zip(page_data.format_local(), page_data.sys.tolist(),
+                       page_data.dia.tolist(), page_data.pulse.tolist())
+            template.render(pdf, rows, row_colors[i:i+rows_per_page], show_legend=(page_num == total_pages - 1))
         
         # Falls keine Daten vorhanden, erstelle trotzdem eine Seite mit Legende
-        if not df_data:
+        if not all_data:
             fig, ax = plt.subplots(figsize=(11.69, 8.27))  # A4 Querformat
             ax.axis('off')
             ax.text(0.5, 0.5, 'Keine Daten vorhanden', 
                    transform=ax.transAxes, fontsize=16, ha='center', va='center')
-            ax.text(0.5, 0.08, 'Legende: Gelb = Morgenwerte, Orange = Abendwerte', 
+            ax.text(0.5, 0.08, tables.LEGEND_TEXT, 
                    transform=ax.transAxes, fontsize=12, ha='center', va='center',
                    bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray", alpha=0.8))
             pdf.savefig(fig, bbox_inches='tight')
             plt.close()
     
-    def run_analysis(self):
-        """Führt die komplette Analyse durch"""
+    def result(self):
+        """Liefert die aktuellen Daten als AnalysisResult"""
+        return AnalysisResult(self.bloodpressure_complete, self.bloodpressure_morning, self.bloodpressure_evening,
+                              self.start_time, self.end_time)
+    
+    def analyze(self):
+        """
+        Lädt und wertet die Daten aus, ohne Diagramme oder Dateien zu erstellen
+        
+        Returns:
+            AnalysisResult
+        """
+        profiler = self.profiler
+        
         print("Lade Daten...")
-        self.load_data()
+        with profiler.stage('load') as info:
+            self.load_data()
+            info['rows'] = len(self.bloodpressure_complete)
         
         print("Sortiere Daten...")
-        self.sort_data()
+        with profiler.stage('sort'):
+            self.sort_data()
         
         print("Filtere nach Zeitraum...")
-        self.filter_by_time_range()
+        with profiler.stage('filter') as info:
+            self.filter_by_time_range()
+            info['rows'] = len(self.bloodpressure_complete)
         
-        print("Erstelle Morgendaten...")
-        self.create_morning_data()
+        print("Erstelle Morgen- und Abenddaten...")
+        with profiler.stage('morning_evening') as info:
+            self.create_morning_evening_data()
+            info['morning_rows'] = len(self.bloodpressure_morning)
+            info['evening_rows'] = len(self.bloodpressure_evening)
         
-        print("Erstelle Abenddaten...")
-        self.create_evening_data()
+        return self.result()
+    
+    def run_analysis(self):
+        """Führt die komplette Analyse durch und erstellt den PDF-Bericht"""
+        self.analyze()
         
         print("Erstelle Liniendiagramme...")
         # SVG-Dateien werden jetzt direkt bei der PDF-Erstellung mit generiert
@@ -580,32 +1447,202 @@ class BloodPressureAnalyzer:
         print(f"Gefundene Datenpunkte: {len(self.bloodpressure_complete)}")
         print(f"Morgendliche Messungen: {len(self.bloodpressure_morning)}")
         print(f"Abendliche Messungen: {len(self.bloodpressure_evening)}")
+    
+    def receive_withings_notifications(self, port, callback_url=None, follow_end=False):
+        """
+        Empfängt Withings Benachrichtigungen und erstellt den Bericht nach jeder neuen Messung neu
+        
+        Statt regelmäßig abzufragen, wird nur der in einer Benachrichtigung
+        genannte Zeitraum abgerufen und in den lokalen Withings-Speicher
+        übernommen; der Bericht wird danach aus dem Speicher erstellt.
+        
+        Args:
+            port: Lokaler Port für die Benachrichtigungen
+            callback_url: Öffentliche Callback-URL, die abonniert wird (optional)
+            follow_end: Endzeitpunkt vor jedem Bericht auf die aktuelle Zeit setzen
+        """
+        if not self.withings_client:
+            print("Fehler: Withings API nicht verfügbar!")
+            return
+        
+        with MeasurementStore(WITHINGS_STORE_FILE) as store:
+            self.withings_client.sync_measurements(store, self.start_time)
+            self.withings_sync = False
+            self.run_analysis()
+            
+            def update_report(count):
+                if count == 0:
+                    return
+                if follow_end:
+                    self.end_time = datetime.now(LOCAL_TZ)
+                self.run_analysis()
+            
+            self.withings_client.run_notification_receiver(store, port, callback_url=callback_url,
+                                                           on_update=update_report)
 
 
 def main():
     parser = argparse.ArgumentParser(description='Blutdruckdaten-Analyzer')
     
     # Mache CSV-Datei optional wenn Withings verwendet wird
-    parser.add_argument('csv_file', nargs='?', help='Pfad zur CSV-Datei mit Blutdruckdaten')
+    parser.add_argument('csv_files', nargs='*', metavar='csv_file',
+                       help='CSV-Datei(en) mit Blutdruckdaten, Glob-Muster (z.B. "exports/*.csv") oder Verzeichnisse')
     parser.add_argument('--start', type=str, help='Startzeitpunkt (YYYY-MM-DD HH:MM:SS)')
     parser.add_argument('--end', type=str, help='Endzeitpunkt (YYYY-MM-DD HH:MM:SS)')
     parser.add_argument('--withings', action='store_true', 
                        help='Verwende Withings API anstatt CSV-Datei')
+    parser.add_argument('--withings-workers', type=int, metavar='N',
+                       help='Zeitraum in Teilbereiche zerlegen und mit N Threads parallel von der Withings API '
+                            'abrufen (z.B. beim ersten Abgleich mehrerer Jahre, Standard: nacheinander)')
+    parser.add_argument('--withings-check', action='store_true',
+                       help='Withings-Verbindung beim Start per getdevice prüfen (Standard: gespeichertem, '
+                            'nicht abgelaufenem Token vertrauen und beim ersten Abruf prüfen)')
+    parser.add_argument('--withings-api-url', type=str, metavar='URL',
+                       help='Abweichende Basis-URL der Withings API, z.B. http://127.0.0.1:8090 für '
+                            'withings_mock_server.py (Standard: api_base_url aus withings_credentials.json)')
+    parser.add_argument('--withings-record', type=str, metavar='DATEI',
+                       help='Withings getmeas-Antworten als JSON-Zeilen aufzeichnen '
+                            '(Wiedergabe mit withings_mock_server.py --replay DATEI)')
+    parser.add_argument('--withings-notify', type=int, metavar='PORT',
+                       help='Dauerbetrieb: Withings Benachrichtigungen auf PORT empfangen, nur den betroffenen '
+                            'Zeitraum abrufen und den Bericht neu erstellen (statt regelmäßiger Abfrage)')
+    parser.add_argument('--withings-callback-url', type=str, metavar='URL',
+                       help='Öffentliche URL, die auf --withings-notify weiterleitet; wird bei Withings abonniert')
+    parser.add_argument('--stats', nargs='?', const='-', metavar='DATEI',
+                       help='Nur auswerten: Anzahl, Mittelwert und Standardabweichung je Kategorie als JSON '
+                            'ausgeben (Standard: Standardausgabe) statt PDF-Bericht und SVG-Diagramm zu erstellen')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                       help='Dauerbetrieb: Daten im Speicher halten und Statistiken, Diagramme und PDF-Berichte '
+                            'für beliebige Zeiträume per HTTP auf 127.0.0.1:PORT liefern (siehe report_server.py)')
+    parser.add_argument('--refresh-interval', type=float, default=2.0, metavar='SEKUNDEN',
+                       help='Mit --serve: Datenquelle höchstens alle SEKUNDEN auf Änderungen prüfen (Standard: 2)')
+    parser.add_argument('--chunk-size', type=int, metavar='N',
+                       help='Liest die CSV-Datei blockweise mit N Zeilen und filtert dabei nach Zeitraum '
+                            '(Speicherbedarf abhängig vom Zeitraum statt von der Dateigröße)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Binär-Cache (<CSV-Datei>.cache) weder lesen noch schreiben')
+    parser.add_argument('--no-store', action='store_true',
+                       help=f'Mit --withings den kompletten Zeitraum direkt abrufen statt {WITHINGS_STORE_FILE} '
+                            'abzugleichen')
+    parser.add_argument('--workers', type=int, metavar='N',
+                       help='Anzahl Prozesse zum parallelen Einlesen mehrerer CSV-Dateien (Standard: Anzahl CPU-Kerne)')
+    parser.add_argument('--render-workers', type=int, metavar='N',
+                       help='PDF-Seiten mit N Prozessen parallel erstellen und in Originalreihenfolge '
+                            'zusammenfügen (benötigt pypdf, Standard: nacheinander)')
+    parser.add_argument('--render-cache', action='store_true',
+                       help=f'Gerenderte PDF-Seiten in {RENDER_CACHE_DIR}/ speichern und unveränderte Seiten '
+                            'wiederverwenden (benötigt pypdf)')
+    parser.add_argument('--rolling-windows', type=str, default='7,30,90', metavar='TAGE',
+                       help='Gleitende Mittelwerte über diese Fensterlängen in Tagen und das 10.-90. Perzentil '
+                            'des längsten Fensters im Gesamtdiagramm einzeichnen (Standard: 7,30,90, '
+                            '"none" zum Abschalten)')
+    parser.add_argument('--full-resolution', action='store_true',
+                       help='Alle Messungen im Gesamtdiagramm zeichnen (sonst Minimum/Maximum je Pixelspalte)')
+    parser.add_argument('--profile', nargs='?', const='bloodpressure_profile.json', metavar='DATEI',
+                       help='Laufzeit, CPU-Zeit und Speicherspitze je Schritt als JSON speichern '
+                            '(Standard: bloodpressure_profile.json, "-" für Standardausgabe)')
+    parser.add_argument('--profile-dump', choices=DUMP_MODES,
+                       help='Zusätzlich cProfile- bzw. tracemalloc-Dump je Schritt im Verzeichnis profile/ ablegen')
+    parser.add_argument('--morning-window', type=str, default='04:00-12:00', metavar='HH:MM-HH:MM',
+                       help='Zeitfenster für Morgenwerte (erste Messung des Tages, Standard: 04:00-12:00)')
+    parser.add_argument('--evening-window', type=str, default='18:00-24:00', metavar='HH:MM-HH:MM',
+                       help='Zeitfenster für Abendwerte (letzte Messung des Tages, Standard: 18:00-24:00)')
     
     args = parser.parse_args()
     
+    # Maschinenlesbare Ausgabe auf der Standardausgabe (--stats -, --profile -):
+    # Fortschrittsmeldungen auf die Standardfehlerausgabe umleiten, damit das JSON gültig bleibt
+    if args.stats == '-' or args.profile == '-':
+        output = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            run(args, output)
+    else:
+        run(args, sys.stdout)
+
+
+def run(args, output):
+    """
+    Führt die über die Kommandozeile gewählte Aktion aus
+
+    Args:
+        args: Geparste Kommandozeilenargumente
+        output: Ausgabestrom für JSON bei --stats - bzw. --profile -
+    """
+    # Erweitere Glob-Muster und Verzeichnisse
+    csv_files = expand_csv_paths(args.csv_files)
+    
     # Validiere Parameter
     if args.withings:
         if not WITHINGS_AVAILABLE:
             print("Fehler: Withings API nicht verfügbar. Installiere 'requests' und führe Setup aus.")
             return
     else:
-        if not args.csv_file:
+        if not csv_files:
             print("Fehler: CSV-Datei erforderlich wenn --withings nicht verwendet wird!")
             return
-        if not Path(args.csv_file).exists():
-            print(f"CSV-Datei nicht gefunden: {args.csv_file}")
-            return
+        for csv_file in csv_files:
+            if not Path(csv_file).exists():
+                print(f"CSV-Datei nicht gefunden: {csv_file}")
+                return
+    
+    if args.withings_notify is not None and not args.withings:
+        print("Fehler: --withings-notify erfordert --withings!")
+        return
+    
+    if args.withings_notify is not None and args.no_store:
+        print("Fehler: --withings-notify benötigt den lokalen Withings-Speicher (ohne --no-store)!")
+        return
+    
+    if args.stats and (args.serve is not None or args.withings_notify is not None):
+        print("Fehler: --stats kann nicht mit --serve oder --withings-notify kombiniert werden!")
+        return
+    
+    if args.serve is not None and args.withings_notify is not None:
+        print("Fehler: --serve und --withings-notify können nicht kombiniert werden!")
+        return
+    
+    if args.serve is not None and args.withings and args.no_store:
+        print("Fehler: --serve benötigt mit --withings den lokalen Withings-Speicher (ohne --no-store)!")
+        return
+    
+    if args.refresh_interval < 0:
+        print("Fehler: --refresh-interval darf nicht negativ sein!")
+        return
+    
+    if args.chunk_size is not None and args.chunk_size <= 0:
+        print("Fehler: --chunk-size muss größer als 0 sein!")
+        return
+    
+    if args.workers is not None and args.workers <= 0:
+        print("Fehler: --workers muss größer als 0 sein!")
+        return
+    
+    if args.withings_workers is not None and args.withings_workers <= 0:
+        print("Fehler: --withings-workers muss größer als 0 sein!")
+        return
+    
+    if args.render_workers is not None and args.render_workers <= 0:
+        print("Fehler: --render-workers muss größer als 0 sein!")
+        return
+    
+    if args.profile_dump and not args.profile:
+        args.profile = 'bloodpressure_profile.json'
+    profiler = PipelineProfiler(enabled=bool(args.profile), dump_mode=args.profile_dump)
+    
+    # Parse Zeitfenster für Morgen- und Abendwerte
+    try:
+        morning_window = parse_time_window(args.morning_window)
+        evening_window = parse_time_window(args.evening_window)
+    except ValueError:
+        print(f"Fehler beim Parsen der Zeitfenster: {args.morning_window} / {args.evening_window}")
+        return
+    
+    # Parse Fensterlängen der gleitenden Statistiken
+    try:
+        rolling_windows = parse_rolling_windows(args.rolling_windows)
+    except ValueError:
+        print(f"Fehler beim Parsen der Fensterlängen: {args.rolling_windows}")
+        return
     
     # Parse Zeitstempel
     start_time = None
@@ -613,10 +1650,7 @@ def main():
     
     if args.start:
         try:
-            start_time = datetime.fromisoformat(args.start.replace(' ', 'T'))
-            # Wenn keine Zeitzone angegeben, verwende lokale Zeitzone
-            if start_time.tzinfo is None:
-                start_time = start_time.replace(tzinfo=LOCAL_TZ)
+            start_time = parse_time_argument(args.start)
         except ValueError:
             print(f"Fehler beim Parsen des Startzeitpunkts: {args.start}")
             return
@@ -627,26 +1661,60 @@ def main():
     
     if args.end:
         try:
-            end_time = datetime.fromisoformat(args.end.replace(' ', 'T'))
-            # Wenn keine Zeitzone angegeben, verwende lokale Zeitzone
-            if end_time.tzinfo is None:
-                end_time = end_time.replace(tzinfo=LOCAL_TZ)
+            end_time = parse_time_argument(args.end)
         except ValueError:
             print(f"Fehler beim Parsen des Endzeitpunkts: {args.end}")
             return
-    elif args.withings:
+    elif args.withings and args.serve is None:
         # Standard-Endzeitpunkt für Withings API: aktuelles Datum und Zeit
+        # (mit --serve offen, damit neue Messungen enthalten sind)
         end_time = datetime.now(LOCAL_TZ)
         print(f"Kein Endzeitpunkt angegeben - verwende aktuelles Datum: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Starte Analyse
     analyzer = BloodPressureAnalyzer(
-        csv_file=args.csv_file, 
+        csv_file=csv_files, 
         start_time=start_time, 
         end_time=end_time,
-        use_withings=args.withings
+        use_withings=args.withings,
+        chunk_size=args.chunk_size,
+        use_cache=not args.no_cache,
+        workers=args.workers,
+        morning_window=morning_window,
+        evening_window=evening_window,
+        profiler=profiler,
+        render_workers=args.render_workers,
+        full_resolution=args.full_resolution,
+        render_cache=args.render_cache,
+        withings_workers=args.withings_workers,
+        withings_check=args.withings_check,
+        withings_api_url=args.withings_api_url,
+        withings_record=args.withings_record,
+        rolling_windows=rolling_windows,
+        use_store=not args.no_store
     )
-    analyzer.run_analysis()
+    if args.serve is not None:
+        from report_server import serve
+        serve(analyzer, args.serve, refresh_interval=args.refresh_interval, csv_patterns=args.csv_files)
+    elif args.withings_notify is not None:
+        analyzer.receive_withings_notifications(args.withings_notify, callback_url=args.withings_callback_url,
+                                                follow_end=not args.end)
+    elif args.stats:
+        stats = analyzer.analyze().to_dict()
+        if args.stats == '-':
+            print(json.dumps(stats, indent=2), file=output)
+        else:
+            with open(args.stats, 'w') as f:
+                json.dump(stats, f, indent=2)
+            print(f"Statistiken gespeichert: {args.stats}")
+    else:
+        analyzer.run_analysis()
+    
+    if args.profile:
+        # Kaltstart: Import dieses Moduls und der erst in den Schritten geladenen Module
+        profiler.add_metric('import_s', MODULE_IMPORT_SECONDS)
+        profiler.add_metric('lazy_import_s', dict(LAZY_IMPORT_TIMES))
+        profiler.write(args.profile, output)
 
 
 if __name__ == '__main__':
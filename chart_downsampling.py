@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Chart Downsampling
+Reduziert dichte Zeitreihen für Diagramme auf Minimum und Maximum je Pixelspalte
+"""
+
+import numpy as np
+
+
+def chart_buckets(fig, ax):
+    """
+    Anzahl Pixelspalten der Zeichenfläche einer Achse
+
+    Args:
+        fig: matplotlib Figure
+        ax: matplotlib Achse
+
+    Returns:
+        Anzahl Spalten (Achsenbreite in Zoll × dpi der Figure)
+    """
+    width_inches = ax.get_position().width * fig.get_size_inches()[0]
+    return max(1, int(width_inches * fig.dpi))
+
+
+def min_max_indices(x, y, buckets):
+    """
+    Wählt je Zeitspalte die Messung mit dem kleinsten und dem größten Wert
+
+    Die x-Achse wird in gleich breite Spalten geteilt; pro Spalte bleiben
+    (höchstens) zwei Punkte erhalten, dazu erster und letzter Punkt. Spitzen
+    bleiben so vollständig sichtbar. Laufzeit O(n), vektorisiert.
+
+    Args:
+        x: Aufsteigend sortiertes numpy Array (z.B. Epoch-Mikrosekunden)
+        y: numpy Array der Werte
+        buckets: Anzahl Spalten
+
+    Returns:
+        Sortiertes numpy Array der ausgewählten Indizes (alle Indizes, falls
+        keine Reduktion nötig ist)
+    """
+    n = len(x)
+    span = int(x[-1]) - int(x[0]) if n else 0
+    if n <= 2 * buckets + 2 or span <= 0:
+        return np.arange(n)
+
+    column = ((x - x[0]) * (buckets / span)).astype(np.int64)
+    np.minimum(column, buckets - 1, out=column)
+
+    # Spaltenanfänge (x sortiert, daher zusammenhängende Spalten)
+    starts = np.flatnonzero(np.concatenate(([True], column[1:] != column[:-1])))
+    counts = np.diff(np.append(starts, n))
+    positions = np.arange(n)
+
+    # Jeweils erste Position, an der Minimum bzw. Maximum der Spalte auftritt
+    selected = [starts[:1], [n - 1]]
+    for reduce in (np.minimum, np.maximum):
+        extreme = np.repeat(reduce.reduceat(y, starts), counts)
+        selected.append(np.minimum.reduceat(np.where(y == extreme, positions, n), starts))
+    return np.unique(np.concatenate(selected))
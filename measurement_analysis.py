@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Measurement Analysis
+Auswertung von Blutdruckmessungen ohne Diagramme und Dateiausgaben
+"""
+
+from datetime import time
+
+import numpy as np
+
+from measurement_series import datetime_to_epoch_us, time_to_us, is_sorted_array
+from rolling_stats import DEFAULT_PERCENTILES, DEFAULT_WINDOWS, rolling_stats
+
+# Standard-Zeitfenster für Morgen- und Abendwerte (Beginn, Ende jeweils inklusive)
+DEFAULT_MORNING_WINDOW = (time(4, 0), time(12, 0))
+DEFAULT_EVENING_WINDOW = (time(18, 0), time.max)
+
+# Messgrößen und Kategorien (Schlüssel, Bezeichnung) in Berichtsreihenfolge
+MEASURES = ('sys', 'dia', 'pulse')
+CATEGORIES = (('complete', 'Komplett'), ('morning', 'Morgens'), ('evening', 'Abends'))
+
+
+def select_per_day(day, time_of_day, window, last=False):
+    """
+    Wählt je Kalendertag die erste bzw. letzte Messung im Zeitfenster aus
+
+    Erwartet zeitlich sortierte Daten. Da die Kalendertage dann in der Regel
+    ebenfalls aufsteigend sind, genügt ein linearer Vergleich benachbarter
+    Tage; nur bei Sprüngen durch wechselnde UTC-Offsets wird gruppiert.
+
+    Args:
+        day: numpy Array mit Kalendertagen (Ortszeit)
+        time_of_day: numpy Array mit Uhrzeiten in Mikrosekunden seit Mitternacht
+        window: Tuple (Beginn, Ende) als datetime.time, jeweils inklusive
+        last: True für letzte statt erste Messung je Tag
+
+    Returns:
+        numpy Array mit Indizes der ausgewählten Messungen
+    """
+    start_us, end_us = time_to_us(window[0]), time_to_us(window[1])
+    candidates = np.flatnonzero((time_of_day >= start_us) & (time_of_day <= end_us))
+    candidate_days = day[candidates]
+    if not len(candidates):
+        return candidates
+
+    if not is_sorted_array(candidate_days):
+        if last:
+            _, reverse_first = np.unique(candidate_days[::-1], return_index=True)
+            return np.sort(candidates[len(candidates) - 1 - reverse_first])
+        _, first = np.unique(candidate_days, return_index=True)
+        return np.sort(candidates[first])
+
+    day_changes = candidate_days[1:] != candidate_days[:-1]
+    if last:
+        return candidates[np.append(day_changes, True)]
+    return candidates[np.insert(day_changes, 0, True)]
+
+
+def select_morning_evening(series, morning_window=DEFAULT_MORNING_WINDOW, evening_window=DEFAULT_EVENING_WINDOW):
+    """
+    Wählt Morgen- und Abendwerte in einem gemeinsamen vektorisierten Durchgang aus
+
+    Args:
+        series: MeasurementSeries
+        morning_window: Zeitfenster der Morgenwerte (erste Messung des Tages)
+        evening_window: Zeitfenster der Abendwerte (letzte Messung des Tages)
+
+    Returns:
+        Tuple (Morgenwerte, Abendwerte) als MeasurementSeries
+    """
+    data = series.sorted()
+    day, time_of_day = data.local_day_and_time()
+    return (data[select_per_day(day, time_of_day, morning_window)],
+            data[select_per_day(day, time_of_day, evening_window, last=True)])
+
+
+def series_stats(series):
+    """
+    Anzahl, Mittelwert und Standardabweichung je Messgröße
+
+    Args:
+        series: MeasurementSeries
+
+    Returns:
+        Dictionary {'count': n, 'sys': {'mean': ..., 'std': ...}, ...} oder None bei leerer Serie
+    """
+    if not series:
+        return None
+    stats = {'count': len(series)}
+    for name in MEASURES:
+        values = getattr(series, name)
+        stats[name] = {'mean': float(np.mean(values)), 'std': float(np.std(values))}
+    return stats
+
+
+class AnalysisResult:
+    """
+    Ergebnis einer Auswertung: Messungen des Zeitraums, Morgen- und Abendwerte
+
+    Die Statistiken werden bei Bedarf berechnet; Diagramme und PDF-Bericht
+    sind optionale Verbraucher dieses Ergebnisses.
+    """
+
+    def __init__(self, complete, morning, evening, start_time=None, end_time=None):
+        """
+        Args:
+            complete: Alle Messungen des Zeitraums (MeasurementSeries)
+            morning: Morgenwerte (MeasurementSeries)
+            evening: Abendwerte (MeasurementSeries)
+            start_time: Beginn des Zeitraums (datetime oder None)
+            end_time: Ende des Zeitraums (datetime oder None)
+        """
+        self.complete = complete
+        self.morning = morning
+        self.evening = evening
+        self.start_time = start_time
+        self.end_time = end_time
+
+    def stats(self):
+        """Statistiken je Kategorie ('complete', 'morning', 'evening'), siehe series_stats()"""
+        return {key: series_stats(getattr(self, key)) for key, _ in CATEGORIES}
+
+    def to_dict(self):
+        """Zeitraum, Anzahl und Statistiken als JSON-taugliches Dictionary"""
+        result = {
+            'start': self.start_time.isoformat() if self.start_time else None,
+            'end': self.end_time.isoformat() if self.end_time else None
+        }
+        for key, _ in CATEGORIES:
+            result[f'{key}_count'] = len(getattr(self, key))
+        result.update(self.stats())
+        return result
+
+    def rolling(self, windows=DEFAULT_WINDOWS, percentiles=DEFAULT_PERCENTILES):
+        """Gleitende Statistiken aller Messungen des Zeitraums (siehe rolling_stats.rolling_stats())"""
+        return rolling_stats(self.complete, windows, percentiles)
+
+
+def analyze(series, start_time=None, end_time=None, morning_window=DEFAULT_MORNING_WINDOW,
+            evening_window=DEFAULT_EVENING_WINDOW):
+    """
+    Wertet Messungen aus: sortieren, Zeitraum filtern, Morgen- und Abendwerte auswählen
+
+    Args:
+        series: MeasurementSeries (sortiert oder unsortiert)
+        start_time: Beginn des Zeitraums (datetime, inklusive) oder None
+        end_time: Ende des Zeitraums (datetime, inklusive) oder None
+        morning_window: Zeitfenster der Morgenwerte
+        evening_window: Zeitfenster der Abendwerte
+
+    Returns:
+        AnalysisResult
+    """
+    complete = series.sorted().time_range(datetime_to_epoch_us(start_time) if start_time else None,
+                                          datetime_to_epoch_us(end_time) if end_time else None)
+    morning, evening = select_morning_evening(complete, morning_window, evening_window)
+    return AnalysisResult(complete, morning, evening, start_time, end_time)
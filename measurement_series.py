@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+MeasurementSeries
+Kompakte spaltenweise Darstellung (Struct-of-Arrays) von Blutdruckmessungen
+"""
+
+from datetime import datetime, timezone, timedelta
+
+import numpy as np
+
+# Mikrosekunden pro Tag / Sekunde
+US_PER_SECOND = 1_000_000
+US_PER_DAY = 86_400 * US_PER_SECOND
+
+# Spalten und ihre Datentypen
+SERIES_DTYPES = {
+    'timestamp': np.int64,   # Epoch-Mikrosekunden (UTC)
+    'utc_offset': np.int32,  # UTC-Offset der Ortszeit in Sekunden
+    'sys': np.int16,
+    'dia': np.int16,
+    'pulse': np.int16
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def time_range_bounds(timestamps, start_us=None, end_us=None):
+    """
+    Bestimmt per Binärsuche den Indexbereich eines Zeitraums
+
+    Args:
+        timestamps: Zeitlich sortiertes numpy Array (Epoch-Mikrosekunden)
+        start_us: Untere Grenze (inklusive) oder None
+        end_us: Obere Grenze (inklusive) oder None
+
+    Returns:
+        Tuple (erster Index, Index hinter dem letzten Treffer)
+    """
+    lower = 0 if start_us is None else int(np.searchsorted(timestamps, start_us, side='left'))
+    upper = len(timestamps) if end_us is None else int(np.searchsorted(timestamps, end_us, side='right'))
+    return lower, max(lower, upper)
+
+
+def is_sorted_array(values):
+    """Prüft in einem vektorisierten Durchgang, ob ein Array aufsteigend sortiert ist"""
+    return bool(np.all(values[1:] >= values[:-1]))
+
+
+def datetime_to_epoch_us(value):
+    """
+    Wandelt einen datetime-Wert in Epoch-Mikrosekunden (UTC) um
+
+    Args:
+        value: datetime (ohne Zeitzone wird UTC angenommen)
+
+    Returns:
+        Epoch-Mikrosekunden als int
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def time_to_us(value):
+    """Wandelt eine Uhrzeit (datetime.time) in Mikrosekunden seit Mitternacht um"""
+    seconds = (value.hour * 60 + value.minute) * 60 + value.second
+    return seconds * US_PER_SECOND + value.microsecond
+
+
+class MeasurementSeries:
+    """
+    Blutdruckmessungen als parallele numpy Arrays
+
+    Pro Messung werden 18 Bytes benötigt (Zeitstempel, UTC-Offset, SYS, DIA,
+    Puls) statt eines Dictionaries mit datetime-Objekt. Slices liefern
+    Views ohne Kopie, Indizierung mit Masken oder Index-Arrays liefert eine
+    neue Serie. Ein einzelner Index liefert die Messung als Dictionary
+    ('timestamp', 'sys', 'dia', 'pulse') wie bisher.
+
+    Ob die Serie zeitlich sortiert ist, wird einmalig ermittelt und
+    gemerkt; Slices und Masken einer sortierten Serie bleiben sortiert.
+    """
+
+    __slots__ = tuple(SERIES_DTYPES) + ('_sorted',)
+
+    def __init__(self, timestamp, utc_offset, sys, dia, pulse, is_sorted=None):
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.utc_offset = np.asarray(utc_offset, dtype=np.int32)
+        self.sys = np.asarray(sys, dtype=np.int16)
+        self.dia = np.asarray(dia, dtype=np.int16)
+        self.pulse = np.asarray(pulse, dtype=np.int16)
+        self._sorted = is_sorted
+
+    @classmethod
+    def empty(cls):
+        """Erzeugt eine leere Serie"""
+        return cls(*(np.empty(0, dtype=dtype) for dtype in SERIES_DTYPES.values()))
+
+    @classmethod
+    def from_columns(cls, columns, is_sorted=None):
+        """
+        Erzeugt eine Serie aus einem Dictionary von Spalten-Arrays
+
+        Args:
+            columns: Dictionary mit 'timestamp', 'utc_offset', 'sys', 'dia', 'pulse'
+            is_sorted: True, falls die Spalten bekanntermaßen zeitlich sortiert sind
+        """
+        return cls(*(columns[name] for name in SERIES_DTYPES), is_sorted=is_sorted)
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Erzeugt eine Serie aus einer Liste von Messungs-Dictionaries
+
+        Args:
+            entries: Liste von Dictionaries mit 'timestamp' (datetime), 'sys', 'dia', 'pulse'
+        """
+        if not entries:
+            return cls.empty()
+
+        timestamps = []
+        offsets = []
+        for entry in entries:
+            timestamp = entry['timestamp']
+            offset = timestamp.utcoffset()
+            if offset is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+                offset = timedelta(0)
+            timestamps.append((timestamp - _EPOCH) // timedelta(microseconds=1))
+            offsets.append(int(offset.total_seconds()))
+
+        return cls(
+            timestamps,
+            offsets,
+            [entry['sys'] for entry in entries],
+            [entry['dia'] for entry in entries],
+            [entry['pulse'] for entry in entries]
+        )
+
+    @classmethod
+    def concatenate(cls, series_list):
+        """Hängt mehrere Serien aneinander"""
+        series_list = list(series_list)
+        if not series_list:
+            return cls.empty()
+        return cls(*(
+            np.concatenate([getattr(series, name) for series in series_list])
+            for name in SERIES_DTYPES
+        ))
+
+    def columns(self):
+        """Liefert die Spalten als Dictionary (ohne Kopie)"""
+        return {name: getattr(self, name) for name in SERIES_DTYPES}
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.entry(index)
+
+        # Slices (ohne negative Schrittweite) und Masken erhalten die Sortierung
+        keeps_order = isinstance(index, slice) and (index.step is None or index.step > 0)
+        keeps_order = keeps_order or (isinstance(index, np.ndarray) and index.dtype == bool)
+        is_sorted = True if keeps_order and self._sorted else None
+        return MeasurementSeries(*(getattr(self, name)[index] for name in SERIES_DTYPES), is_sorted=is_sorted)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.entry(i)
+
+    def __repr__(self):
+        return f"MeasurementSeries({len(self)} Messungen)"
+
+    @property
+    def nbytes(self):
+        """Speicherbedarf der Arrays in Bytes"""
+        return sum(getattr(self, name).nbytes for name in SERIES_DTYPES)
+
+    @property
+    def datetimes(self):
+        """Zeitstempel als numpy datetime64[us] in UTC (z.B. für matplotlib)"""
+        return self.timestamp.astype('datetime64[us]')
+
+    @property
+    def local_us(self):
+        """Ortszeit der Messungen in Epoch-Mikrosekunden (Zeitstempel + UTC-Offset)"""
+        return self.timestamp + self.utc_offset.astype(np.int64) * US_PER_SECOND
+
+    def local_day_and_time(self):
+        """
+        Zerlegt die Ortszeit in Kalendertag und Uhrzeit
+
+        Returns:
+            Tuple aus numpy Arrays: Tag (Tage seit 1970-01-01) und
+            Uhrzeit (Mikrosekunden seit Mitternacht)
+        """
+        local_us = self.local_us
+        day = local_us // US_PER_DAY
+        return day, local_us - day * US_PER_DAY
+
+    @property
+    def local_datetimes(self):
+        """Ortszeit der Messungen als numpy datetime64[us]"""
+        return self.local_us.astype('datetime64[us]')
+
+    def datetime_at(self, index):
+        """Zeitstempel einer Messung als datetime mit ursprünglicher Zeitzone"""
+        tz = timezone(timedelta(seconds=int(self.utc_offset[index])))
+        return (_EPOCH + timedelta(microseconds=int(self.timestamp[index]))).astimezone(tz)
+
+    def entry(self, index):
+        """Eine Messung als Dictionary ('timestamp', 'sys', 'dia', 'pulse')"""
+        return {
+            'timestamp': self.datetime_at(index),
+            'sys': int(self.sys[index]),
+            'dia': int(self.dia[index]),
+            'pulse': int(self.pulse[index])
+        }
+
+    def to_entries(self):
+        """Wandelt die Serie in eine Liste von Messungs-Dictionaries um"""
+        return [self.entry(i) for i in range(len(self))]
+
+    def format_local(self, fmt='%d.%m.%Y %H:%M:%S'):
+        """
+        Formatiert die Ortszeit aller Messungen als Strings
+
+        Args:
+            fmt: strftime-Format
+
+        Returns:
+            Liste von Strings
+        """
+        return [value.strftime(fmt) for value in self.local_datetimes.tolist()]
+
+    def is_sorted(self):
+        """Prüft (einmalig, O(n) vektorisiert), ob die Serie zeitlich sortiert ist"""
+        if self._sorted is None:
+            self._sorted = is_sorted_array(self.timestamp)
+        return self._sorted
+
+    def argsort(self):
+        """Stabile Sortierreihenfolge nach Zeitstempel"""
+        return np.argsort(self.timestamp, kind='stable')
+
+    def sorted(self):
+        """Liefert die Serie zeitlich sortiert (ohne Sortieren, falls bereits sortiert)"""
+        if self.is_sorted():
+            return self
+        series = self[self.argsort()]
+        series._sorted = True
+        return series
+
+    def time_range(self, start_us=None, end_us=None):
+        """
+        Liefert die Messungen im Zeitraum [start_us, end_us]
+
+        Bei sortierter Serie per Binärsuche in O(log n) als View ohne Kopie,
+        sonst per Maske.
+
+        Args:
+            start_us: Untere Grenze in Epoch-Mikrosekunden (inklusive) oder None
+            end_us: Obere Grenze in Epoch-Mikrosekunden (inklusive) oder None
+
+        Returns:
+            MeasurementSeries
+        """
+        if self._sorted:
+            lower, upper = time_range_bounds(self.timestamp, start_us, end_us)
+            return self[lower:upper]
+
+        mask = np.ones(len(self), dtype=bool)
+        if start_us is not None:
+            mask &= self.timestamp >= start_us
+        if end_us is not None:
+            mask &= self.timestamp <= end_us
+        return self[mask]
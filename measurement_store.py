@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Measurement Store
+Lokaler SQLite-Speicher für Withings-Messungen mit inkrementellem Abgleich
+"""
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+from measurement_series import MeasurementSeries, SERIES_DTYPES
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS measurements (
+    grpid INTEGER PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    utc_offset INTEGER NOT NULL,
+    sys INTEGER NOT NULL,
+    dia INTEGER NOT NULL,
+    pulse INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS measurements_timestamp ON measurements (timestamp);
+CREATE TABLE IF NOT EXISTS sync_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _entry_row(entry):
+    """Wandelt eine Messung (Dictionary mit 'grpid') in eine Tabellenzeile um"""
+    timestamp = entry['timestamp']
+    offset = timestamp.utcoffset()
+    if offset is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+        offset = timedelta(0)
+    return (entry['grpid'], (timestamp - _EPOCH) // timedelta(microseconds=1), int(offset.total_seconds()),
+            entry['sys'], entry['dia'], entry['pulse'])
+
+
+class MeasurementStore:
+    """
+    Messungen in einer SQLite-Datenbank, eindeutig je Withings-Messgruppe (grpid)
+
+    Neue und geänderte Messgruppen werden per Upsert übernommen, sodass ein
+    wiederholter oder überlappender Abgleich keine Duplikate erzeugt. Der
+    Zeitpunkt des letzten Abgleichs ('lastupdate') und der Beginn des
+    abgeglichenen Zeitraums ('synced_from') werden in sync_state gespeichert.
+    Zeitraumabfragen nutzen den Index auf der Zeitstempel-Spalte.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Pfad der SQLite-Datei (wird bei Bedarf angelegt)
+        """
+        self.path = Path(path)
+        self._connection = sqlite3.connect(str(self.path))
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Schließt die Datenbankverbindung"""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM measurements").fetchone()[0]
+
+    def get_state(self, key):
+        """Liefert einen gespeicherten Abgleich-Wert oder None"""
+        row = self._connection.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def upsert(self, entries, state=None):
+        """
+        Übernimmt Messungen und Abgleich-Werte in einer Transaktion
+
+        Args:
+            entries: Iterable von Dictionaries mit 'grpid', 'timestamp' (datetime),
+                'sys', 'dia', 'pulse' (z.B. ein Generator über die API-Seiten)
+            state: Optionales Dictionary mit Abgleich-Werten (z.B. 'lastupdate'),
+                wird nur gespeichert, wenn alle Messungen übernommen wurden
+
+        Returns:
+            Anzahl übernommener Messungen
+        """
+        with self._connection:
+            cursor = self._connection.executemany(
+                "INSERT INTO measurements (grpid, timestamp, utc_offset, sys, dia, pulse) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(grpid) DO UPDATE SET timestamp = excluded.timestamp, "
+                "utc_offset = excluded.utc_offset, sys = excluded.sys, dia = excluded.dia, "
+                "pulse = excluded.pulse",
+                map(_entry_row, entries)
+            )
+            if state:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)", state.items()
+                )
+        return max(cursor.rowcount, 0)
+
+    def load_range(self, start_us=None, end_us=None):
+        """
+        Liest die Messungen eines Zeitraums (Grenzen inklusive) zeitlich sortiert
+
+        Args:
+            start_us: Untere Grenze in Epoch-Mikrosekunden oder None
+            end_us: Obere Grenze in Epoch-Mikrosekunden oder None
+
+        Returns:
+            MeasurementSeries
+        """
+        cursor = self._connection.execute(
+            "SELECT timestamp, utc_offset, sys, dia, pulse FROM measurements "
+            "WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp",
+            (np.iinfo(np.int64).min if start_us is None else int(start_us),
+             np.iinfo(np.int64).max if end_us is None else int(end_us))
+        )
+        rows = np.array(cursor.fetchall(), dtype=np.int64).reshape(-1, len(SERIES_DTYPES))
+        return MeasurementSeries(*rows.T, is_sorted=True)
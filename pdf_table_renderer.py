@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+PDF-Tabellenrenderer
+Schnelle Ausgabe der Messwert-Tabelle als einfacher PDF-Text mit Rechtecken
+"""
+
+import matplotlib.pyplot as plt
+from matplotlib.collections import PathCollection
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.transforms import Bbox, BboxTransformTo, TransformedBbox
+
+# Seitenformat und Tabellenaufbau
+PAGE_SIZE = (11.69, 8.27)  # A4 Querformat
+ROWS_PER_PAGE = 30
+HEADER = ('Zeitstempel', 'SYS', 'DIA', 'Puls')
+FONT_SIZE = 9
+
+# Tabellenbereich in Achsenkoordinaten [x, y, Breite, Höhe]
+TABLE_BBOX = (0, 0.15, 1, 0.80)
+# Rand um den Achsenbereich beim Zuschneiden der Seite (Zoll)
+PAGE_PAD_INCHES = 0.1
+
+# Farbmarkierungen
+MORNING_COLOR = '#FFFF99'  # Helles Gelb
+EVENING_COLOR = '#FFB366'  # Helles Orange
+DEFAULT_COLOR = 'white'
+LEGEND_TEXT = 'Legende: Gelb = Morgenwerte, Orange = Abendwerte'
+
+# Text mit den PDF-Standardschriften (Helvetica) ausgeben: keine Glyphen-
+# Einbettung und kein Glyphen-Layout pro Zeichen
+_PDF_TEXT_RC = {'pdf.use14corefonts': True}
+_TEXT_WEIGHT = 'medium'  # Gewicht der Helvetica-AFM-Metriken
+_CELL_FONT = FontProperties(size=FONT_SIZE, weight=_TEXT_WEIGHT)
+_LEGEND_FONT = FontProperties(size=12, weight=_TEXT_WEIGHT)
+
+
+def _axes_position(fig):
+    """Bereich einer Standard-Achse (plt.subplots) in Figure-Koordinaten, ohne eine Achse anzulegen"""
+    params = fig.subplotpars
+    return Bbox.from_extents(params.left, params.bottom, params.right, params.top)
+
+
+def _page_bbox(fig, position):
+    """Seitenausschnitt: Achsenbereich plus Rand (entspricht bbox_inches='tight' der bisherigen Tabelle)"""
+    width, height = fig.get_size_inches()
+    return Bbox.from_extents(
+        position.x0 * width - PAGE_PAD_INCHES, position.y0 * height - PAGE_PAD_INCHES,
+        position.x1 * width + PAGE_PAD_INCHES, position.y1 * height + PAGE_PAD_INCHES
+    )
+
+
+def _grid_path(rows, columns, x0, y_top, cell_width, cell_height):
+    """Gitterlinien aller Zellen als ein einziger Pfad (Achsenkoordinaten)"""
+    y_bottom = y_top - rows * cell_height
+    x_right = x0 + columns * cell_width
+    vertices = []
+    for row in range(rows + 1):
+        y = y_top - row * cell_height
+        vertices.extend([(x0, y), (x_right, y)])
+    for column in range(columns + 1):
+        x = x0 + column * cell_width
+        vertices.extend([(x, y_top), (x, y_bottom)])
+    return Path(vertices, [Path.MOVETO, Path.LINETO] * (len(vertices) // 2))
+
+
+def _rows_path(row_indices, x0, y_top, row_width, cell_height):
+    """Hintergrund mehrerer Tabellenzeilen als ein zusammengesetzter Pfad"""
+    vertices = []
+    for row in row_indices:
+        top = y_top - row * cell_height
+        bottom = top - cell_height
+        vertices.extend([(x0, bottom), (x0 + row_width, bottom), (x0 + row_width, top), (x0, top), (x0, bottom)])
+    codes = [Path.MOVETO, Path.LINETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY] * len(row_indices)
+    return Path(vertices, codes)
+
+
+class TablePageTemplate:
+    """
+    Wiederverwendbare Vorlage für Tabellenseiten
+
+    Figure, Zeilenhintergründe, Gitter, alle Zelltexte und die Legende werden
+    einmal angelegt. Pro Seite werden nur Texte, Farben und Gitter
+    aktualisiert und die Seite gespeichert (kein erneutes Anlegen und kein
+    Layout pro Seite). Zeilenhintergründe je Farbe und das Gitter sind je ein
+    Pfad, der Text wird in einer PDF-Standardschrift ausgegeben. Das
+    Seitenformat ist fest vorgegeben, sodass jede Seite nur einmal gezeichnet
+    wird (kein bbox_inches='tight').
+    """
+
+    def __init__(self, rows_per_page=ROWS_PER_PAGE):
+        """
+        Args:
+            rows_per_page: Anzahl Datenzeilen pro Seite (bestimmt die Zeilenhöhe)
+        """
+        self.rows_per_page = rows_per_page
+
+        # Figure ohne pyplot-Verwaltung (kein Fenster-Manager, kein plt.close nötig)
+        self.figure = Figure(figsize=PAGE_SIZE)
+        position = _axes_position(self.figure)
+        self._page_bbox = _page_bbox(self.figure, position)
+        # Koordinaten relativ zum Achsenbereich wie bei ax.transAxes
+        self._transform = BboxTransformTo(TransformedBbox(position, self.figure.transFigure))
+
+        x0, y0, width, height = TABLE_BBOX
+        self._x0 = x0
+        self._width = width
+        self._cell_width = width / len(HEADER)
+        self._cell_height = height / (rows_per_page + 1)  # +1 wegen Header-Zeile
+        self._y_top = y0 + height
+
+        # Zeilenhintergründe je Farbe (bei Bedarf angelegt), Gitter darüber
+        self._backgrounds = {}
+        self._grid = self._add_paths(facecolors='none', edgecolors='black', linewidths=1.0, zorder=1.5)
+
+        # Zelltexte: Zeile 0 ist der Header
+        self._cells = []
+        for row_index in range(rows_per_page + 1):
+            y = self._y_top - (row_index + 0.5) * self._cell_height
+            self._cells.append([
+                self.figure.text(x0 + (column + 0.5) * self._cell_width, y,
+                                 HEADER[column] if row_index == 0 else '', transform=self._transform,
+                                 fontproperties=_CELL_FONT, ha='center', va='center')
+                for column in range(len(HEADER))
+            ])
+
+        self._legend = self.figure.text(0.5, 0.08, LEGEND_TEXT, transform=self._transform,
+                                        fontproperties=_LEGEND_FONT, ha='center', va='center',
+                                        bbox=dict(boxstyle="round,pad=0.3", facecolor="lightgray", alpha=0.8),
+                                        visible=False)
+
+    def _add_paths(self, **kwargs):
+        """Legt eine (zunächst leere) Pfad-Sammlung in Tabellenkoordinaten an"""
+        collection = PathCollection([], transform=self._transform, **kwargs)
+        self.figure.add_artist(collection)
+        return collection
+
+    def render(self, pdf, rows, colors, show_legend=False):
+        """
+        Schreibt eine Tabellenseite ins PDF
+
+        Args:
+            pdf: PdfPages Objekt
+            rows: Zeilen mit je 4 Werten (Zeitstempel, SYS, DIA, Puls), max. rows_per_page
+            colors: Hintergrundfarbe je Zeile (z.B. MORNING_COLOR)
+            show_legend: Legende unter der Tabelle ausgeben (letzte Seite)
+        """
+        row_count = 0
+        for row_index, row in enumerate(rows, 1):
+            for text, value in zip(self._cells[row_index], row):
+                text.set_text(str(value))
+            row_count = row_index
+        # Übrige Zeilen leeren (ohne Umrandung)
+        for row_cells in self._cells[row_count + 1:]:
+            for text in row_cells:
+                text.set_text('')
+
+        # Farbige Zeilen (Header ist Zeile 0)
+        rows_by_color = {}
+        for row_index, color in enumerate(colors, 1):
+            if color != DEFAULT_COLOR:
+                rows_by_color.setdefault(color, []).append(row_index)
+        for color in rows_by_color:
+            if color not in self._backgrounds:
+                self._backgrounds[color] = self._add_paths(facecolors=color, edgecolors='none', zorder=1)
+        for color, background in self._backgrounds.items():
+            row_indices = rows_by_color.get(color)
+            background.set_paths([_rows_path(row_indices, self._x0, self._y_top, self._width, self._cell_height)]
+                                 if row_indices else [])
+
+        # Nur Header und echte Datenzeilen erhalten Zellen mit Umrandung
+        self._grid.set_paths([_grid_path(row_count + 1, len(HEADER), self._x0, self._y_top,
+                                         self._cell_width, self._cell_height)])
+        self._legend.set_visible(show_legend)
+
+        with plt.rc_context(_PDF_TEXT_RC):
+            pdf.savefig(self.figure, bbox_inches=self._page_bbox)
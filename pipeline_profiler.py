@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Pipeline Profiler
+Misst Laufzeit, CPU-Zeit und Speicherbedarf der einzelnen Analyse-Schritte
+"""
+
+import cProfile
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Format der JSON-Ausgabe (bei inkompatiblen Änderungen erhöhen)
+PROFILE_VERSION = 2
+
+# Unterstützte Detail-Dumps pro Schritt
+DUMP_MODES = ('cprofile', 'tracemalloc')
+
+
+def _max_rss_bytes():
+    """Maximaler Resident Set Size des Prozesses in Bytes (None falls nicht verfügbar)"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux liefert Kilobytes, macOS Bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _current_rss_bytes():
+    """Aktueller Resident Set Size des Prozesses in Bytes (None falls nicht verfügbar, nur Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def stop_tracing():
+    """
+    Beendet tracemalloc im aktuellen Prozess
+
+    Als initializer von Prozess-Pools: per fork gestartete Worker erben das
+    laufende tracemalloc des Elternprozesses, messen dort aber nichts.
+    """
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+class PipelineProfiler:
+    """
+    Erfasst Messwerte für nacheinander ausgeführte Pipeline-Schritte
+
+    Ist der Profiler deaktiviert, ist stage() ein reiner Durchlauf ohne
+    Messung. Der Speicherbedarf wird über die RSS-Differenz je Schritt
+    gemessen; tracemalloc verlangsamt jede Allokation erheblich und läuft
+    daher nur mit dump_mode='tracemalloc'. Schritte werden nicht
+    verschachtelt, da die Speicherspitze (tracemalloc) pro Schritt
+    zurückgesetzt wird.
+    """
+
+    def __init__(self, enabled=False, dump_mode=None, dump_dir='profile'):
+        """
+        Args:
+            enabled: Messungen aktivieren
+            dump_mode: Optional 'cprofile' oder 'tracemalloc' für Detail-Dumps pro Schritt
+            dump_dir: Verzeichnis für die Detail-Dumps
+        """
+        self.enabled = enabled
+        self.dump_mode = dump_mode
+        self.dump_dir = Path(dump_dir)
+        self.stages = []
+        self.metrics = {}
+        self.started_at = datetime.now().astimezone()
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+        self.trace_memory = self.enabled and self.dump_mode == 'tracemalloc'
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self.enabled and self.dump_mode:
+            self.dump_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Misst einen Pipeline-Schritt
+
+        Args:
+            name: Name des Schritts (z.B. 'load', 'pdf.table_pages')
+
+        Yields:
+            Dictionary für zusätzliche Angaben zum Schritt (z.B. Anzahl Zeilen)
+        """
+        info = {}
+        if not self.enabled:
+            yield info
+            return
+
+        profile = cProfile.Profile() if self.dump_mode == 'cprofile' else None
+        if self.trace_memory and hasattr(tracemalloc, 'reset_peak'):  # ab Python 3.9
+            tracemalloc.reset_peak()
+        start_rss = _current_rss_bytes()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        if profile:
+            profile.enable()
+
+        try:
+            yield info
+        finally:
+            if profile:
+                profile.disable()
+            wall = time.perf_counter() - start_wall
+            cpu = time.process_time() - start_cpu
+            rss = _current_rss_bytes()
+
+            record = {
+                'name': name,
+                'wall_s': round(wall, 6),
+                'cpu_s': round(cpu, 6),
+                'rss_bytes_after': rss,
+                'rss_delta_bytes': rss - start_rss if rss is not None and start_rss is not None else None,
+                'max_rss_bytes': _max_rss_bytes()
+            }
+            if self.trace_memory:
+                record['traced_bytes_after'], record['peak_traced_bytes'] = tracemalloc.get_traced_memory()
+            record.update(info)
+            self.stages.append(record)
+            self._dump(name, profile)
+
+    def _dump(self, name, profile):
+        """Schreibt den Detail-Dump eines Schritts"""
+        if not self.dump_mode:
+            return
+        file_stem = f"{len(self.stages):02d}_{re.sub(r'[^A-Za-z0-9_.-]', '_', name)}"
+        if profile:
+            profile.dump_stats(str(self.dump_dir / f'{file_stem}.prof'))
+        elif self.dump_mode == 'tracemalloc':
+            tracemalloc.take_snapshot().dump(str(self.dump_dir / f'{file_stem}.tracemalloc'))
+
+    def add_metric(self, name, value):
+        """Hinterlegt einen zusätzlichen Messwert außerhalb der Schritte"""
+        if self.enabled:
+            self.metrics[name] = value
+
+    def to_dict(self):
+        """Liefert alle Messwerte als JSON-serialisierbares Dictionary"""
+        return {
+            'version': PROFILE_VERSION,
+            'started_at': self.started_at.isoformat(),
+            'python': sys.version.split()[0],
+            'total': {
+                'wall_s': round(time.perf_counter() - self._start_wall, 6),
+                'cpu_s': round(time.process_time() - self._start_cpu, 6),
+                'max_rss_bytes': _max_rss_bytes()
+            },
+            'metrics': self.metrics,
+            'stages': self.stages
+        }
+
+    def write(self, path, stream=None):
+        """
+        Schreibt die Messwerte als JSON
+
+        Args:
+            path: Zieldatei oder '-' für die Standardausgabe
+            stream: Ausgabestrom für '-' (Standard: sys.stdout)
+        """
+        data = self.to_dict()
+        if str(path) == '-':
+            stream = stream or sys.stdout
+            json.dump(data, stream, indent=2)
+            print(file=stream)
+            return
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+        print(f"Profil gespeichert: {path}")
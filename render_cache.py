@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Render-Cache
+Inhaltsadressierter Zwischenspeicher für gerenderte PDF-Seiten
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+
+# Bei Änderungen an Layout oder Render-Code erhöhen (macht alle Einträge ungültig)
+RENDER_CACHE_VERSION = 1
+
+# Fragmente werden nach Alter und Gesamtgröße verdrängt (am längsten unbenutzte zuerst),
+# damit sich Berichte über verschiedene Zeiträume den Cache teilen können
+MAX_AGE_DAYS = 30
+MAX_BYTES = 256 * 1024 * 1024
+
+# Temporäre Dateien und Sperren gelten erst nach dieser Zeit (Sekunden) als verwaist
+STALE_SECONDS = 3600
+
+# Sperrdatei, solange ein Lauf den Cache aufräumt
+PRUNE_LOCK_FILE = '.prune.lock'
+
+
+def _unlink(path):
+    """Entfernt eine Datei; bereits entfernte Dateien (z.B. durch einen parallelen Lauf) zählen nicht"""
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _age_seconds(path, now):
+    """Alter der letzten Änderung in Sekunden (None falls die Datei nicht mehr existiert)"""
+    try:
+        return now - path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+
+class RenderCache:
+    """
+    Speichert gerenderte PDF-Fragmente unter dem SHA-256 ihres Inhalts-Schlüssels
+
+    Der Schlüssel wird aus den Daten der Seite und allen Render-Parametern
+    gebildet; gleiche Daten ergeben denselben Schlüssel, sodass unveränderte
+    Seiten nicht erneut gerendert werden müssen. Die Änderungszeit eines
+    Fragments wird bei jedem Treffer erneuert und dient als Zeitpunkt der
+    letzten Verwendung (LRU).
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: Verzeichnis für die Fragmente (wird bei Bedarf angelegt)
+        """
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts):
+        """
+        Bildet den Schlüssel aus beliebigen Bestandteilen
+
+        Args:
+            parts: bytes, numpy Arrays oder andere Werte (werden per repr() kodiert)
+
+        Returns:
+            Hex-String (SHA-256)
+        """
+        digest = hashlib.sha256(f'v{RENDER_CACHE_VERSION}'.encode())
+        for part in parts:
+            if hasattr(part, 'tobytes'):
+                data = part.tobytes()
+            elif isinstance(part, bytes):
+                data = part
+            else:
+                data = repr(part).encode()
+            # Länge voranstellen, damit Grenzen zwischen Bestandteilen eindeutig sind
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return self.directory / f'{key}.pdf'
+
+    def get(self, key):
+        """Liefert das gespeicherte Fragment oder None (und vermerkt die Verwendung)"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(str(path))
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Speichert ein Fragment atomar (erst temporäre Datei, dann umbenennen)
+
+        Die temporäre Datei hat einen eindeutigen Namen, sodass parallele
+        Prozesse oder Threads mit demselben Schlüssel sich nicht überschreiben.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=self.directory, prefix=f'{key}.', suffix='.tmp',
+                                         delete=False) as f:
+            f.write(data)
+            tmp_path = f.name
+        os.replace(tmp_path, self._path(key))
+
+    def _acquire_prune_lock(self, now):
+        """
+        Legt die Sperrdatei exklusiv an
+
+        Returns:
+            True wenn die Sperre erhalten wurde (False: ein anderer Lauf räumt gerade auf)
+        """
+        lock_path = self.directory / PRUNE_LOCK_FILE
+        for _ in range(2):
+            try:
+                os.close(os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except FileExistsError:
+                age = _age_seconds(lock_path, now)
+                # Sperre eines abgebrochenen Laufs übernehmen
+                if age is not None and age < STALE_SECONDS:
+                    return False
+                _unlink(lock_path)
+        return False
+
+    def prune(self, keep_keys=(), max_age_days=MAX_AGE_DAYS, max_bytes=MAX_BYTES):
+        """
+        Entfernt lange nicht verwendete Fragmente
+
+        Fragmente, die seit max_age_days nicht verwendet wurden, werden
+        entfernt; übersteigt der Cache danach max_bytes, zusätzlich die am
+        längsten unbenutzten. Fragmente anderer Berichte (z.B. ein anderer
+        Zeitraum) bleiben so erhalten, solange sie verwendet werden. Parallele Läufe teilen sich das Verzeichnis: Temporäre Dateien werden
+        erst nach STALE_SECONDS entfernt (ein anderer Lauf kann sie gerade
+        schreiben), und räumt bereits ein anderer Lauf auf (Sperrdatei),
+        wird das Aufräumen übersprungen.
+
+        Args:
+            keep_keys: Schlüssel der aktuell verwendeten Fragmente (werden nie entfernt)
+            max_age_days: Höchstalter seit der letzten Verwendung in Tagen
+            max_bytes: Höchstgröße aller Fragmente in Bytes
+
+        Returns:
+            Anzahl entfernter Dateien
+        """
+        if not self.directory.is_dir():
+            return 0
+        now = time.time()
+        if not self._acquire_prune_lock(now):
+            return 0
+        try:
+            keep = {f'{key}.pdf' for key in keep_keys}
+            removed = 0
+            fragments = []
+            total_bytes = 0
+            for path in self.directory.iterdir():
+                if path.suffix == '.tmp':
+                    age = _age_seconds(path, now)
+                    if age is not None and age >= STALE_SECONDS:
+                        removed += _unlink(path)
+                elif path.suffix == '.pdf':
+                    try:
+                        stat = path.stat()
+                    except FileNotFoundError:
+                        continue
+                    total_bytes += stat.st_size
+                    if path.name not in keep:
+                        fragments.append((stat.st_mtime, stat.st_size, path))
+
+            # Am längsten unbenutzte zuerst: zu alt oder über der Höchstgröße
+            fragments.sort(key=lambda fragment: fragment[0])
+            for mtime, size, path in fragments:
+                if now - mtime < max_age_days * 86400 and total_bytes <= max_bytes:
+                    break
+                removed += _unlink(path)
+                total_bytes -= size
+            return removed
+        finally:
+            _unlink(self.directory / PRUNE_LOCK_FILE)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Report Server
+Dauerbetrieb des Analyzers: Messdaten bleiben im Speicher, Statistiken,
+Diagramme und PDF-Berichte werden per HTTP für beliebige Zeiträume geliefert
+"""
+
+import copy
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from measurement_series import MeasurementSeries
+from measurement_analysis import analyze
+from measurement_store import MeasurementStore
+from pipeline_profiler import PipelineProfiler
+from blood_pressure_analyzer import (WITHINGS_STORE_FILE, expand_csv_paths, lazy_import, load_csv_file,
+                                     merge_sorted_columns, parse_time_argument)
+
+# Standard-Port und Mindestabstand zwischen zwei Prüfungen der Datenquelle
+DEFAULT_PORT = 8765
+DEFAULT_REFRESH_INTERVAL = 2.0
+# Abgleich mit der Withings API (lastupdate) höchstens alle N Sekunden
+WITHINGS_REFRESH_INTERVAL = 300.0
+# Anzahl zwischengespeicherter Zeiträume bzw. gerenderter Antworten
+VIEW_CACHE_SIZE = 32
+RESPONSE_CACHE_SIZE = 64
+
+# Diagramme: URL-Name -> Render-Methode des Analyzers
+CHARTS = {
+    'complete': '_create_complete_chart_for_pdf',
+    'morning_evening': '_create_morning_evening_chart_for_pdf',
+    'average': '_create_average_chart_for_pdf'
+}
+CHART_FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+
+
+class _FigureSink:
+    """Nimmt wie PdfPages eine Figure per savefig() entgegen und speichert sie als PNG oder SVG"""
+
+    def __init__(self, image_format):
+        self.format = image_format
+        self.buffer = io.BytesIO()
+
+    def savefig(self, figure=None, **kwargs):
+        (figure or lazy_import('matplotlib.pyplot').gcf()).savefig(self.buffer, format=self.format, **kwargs)
+
+
+class _LRUCache:
+    """Einfacher threadsicherer LRU-Cache"""
+
+    def __init__(self, size):
+        self.size = size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class ReportService:
+    """
+    Hält die Messdaten im Speicher und erstellt Auswertungen für Zeiträume
+
+    Die Datenquelle (CSV-Dateien bzw. lokaler Withings-Speicher) wird
+    höchstens alle refresh_interval Sekunden auf Änderungen geprüft; bei
+    CSV-Dateien werden Verzeichnisse und Glob-Muster dabei neu erweitert
+    (z.B. ein neuer Monatsexport) und nur neue oder geänderte Dateien neu
+    geladen (über den Binär-Cache). Morgen- und Abendwerte werden je Zeitraum einmal berechnet
+    und zusammen mit gerenderten Diagrammen und PDFs zwischengespeichert.
+    """
+
+    def __init__(self, analyzer, refresh_interval=DEFAULT_REFRESH_INTERVAL, csv_patterns=None):
+        """
+        Args:
+            analyzer: Konfigurierter BloodPressureAnalyzer (Datenquelle, Zeitfenster,
+                Standard-Zeitraum aus start_time/end_time)
+            refresh_interval: Mindestabstand zwischen zwei Prüfungen der Datenquelle (Sekunden)
+            csv_patterns: CSV-Dateien, Glob-Muster oder Verzeichnisse wie auf der Kommandozeile
+                (Standard: die Dateien des Analyzers)
+        """
+        self.analyzer = analyzer
+        self.refresh_interval = refresh_interval
+        self.csv_patterns = list(csv_patterns or analyzer.csv_files)
+        self.version = 0
+        self.data = MeasurementSeries.empty()
+        self._csv_parts = {}
+        self._signature = None
+        self._last_check = 0.0
+        self._last_withings_sync = 0.0
+        self._data_lock = threading.Lock()
+        # matplotlib (pyplot) ist nicht threadsicher: Rendern nacheinander
+        self._render_lock = threading.Lock()
+        self._views = _LRUCache(VIEW_CACHE_SIZE)
+        self._responses = _LRUCache(RESPONSE_CACHE_SIZE)
+
+        # Renderer ohne Dateiausgaben, Profiler und Prozess-Pool
+        self._renderer = copy.copy(analyzer)
+        self._renderer.complete_svg_file = None
+        self._renderer.render_workers = None
+        self._renderer.render_cache = False
+        self._renderer.profiler = PipelineProfiler(enabled=False)
+        self._renderer._page_templates = {}
+
+        self.refresh(force=True)
+
+    def _source_signature(self):
+        """Änderungsmerkmal der Datenquelle (Pfad, Änderungszeit, Größe)"""
+        if self.analyzer.use_withings:
+            paths = [WITHINGS_STORE_FILE, WITHINGS_STORE_FILE + '-wal']
+        else:
+            paths = expand_csv_paths(self.csv_patterns)
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _load(self, signature):
+        """Lädt den Withings-Speicher bzw. nur die geänderten CSV-Dateien"""
+        if self.analyzer.use_withings:
+            with MeasurementStore(WITHINGS_STORE_FILE) as store:
+                return store.load_range()
+
+        previous = {entry[0]: entry for entry in self._signature or ()}
+        paths = [entry[0] for entry in signature]
+        for entry in signature:
+            path = entry[0]
+            if previous.get(path) != entry or path not in self._csv_parts:
+                print(f"Lade {path}...")
+                self._csv_parts[path] = load_csv_file(path, chunk_size=self.analyzer.chunk_size,
+                                                      use_cache=self.analyzer.use_cache)
+        # Nicht mehr vorhandene Dateien vergessen
+        for path in set(self._csv_parts) - set(paths):
+            del self._csv_parts[path]
+        parts = [self._csv_parts[path] for path in paths]
+        return MeasurementSeries.from_columns(merge_sorted_columns(parts), is_sorted=True)
+
+    def refresh(self, force=False):
+        """
+        Lädt geänderte Daten neu (höchstens alle refresh_interval Sekunden)
+
+        Returns:
+            True wenn sich die Daten geändert haben
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.refresh_interval:
+            return False
+
+        with self._data_lock:
+            if not force and now - self._last_check < self.refresh_interval:
+                return False
+            self._last_check = now
+
+            if self.analyzer.use_withings and self.analyzer.withings_client and \
+                    (force or now - self._last_withings_sync >= WITHINGS_REFRESH_INTERVAL):
+                self._last_withings_sync = now
+                try:
+                    with MeasurementStore(WITHINGS_STORE_FILE) as store:
+                        synced = self.analyzer.withings_client.sync_measurements(store, self.analyzer.start_time)
+                except Exception as e:
+                    # z.B. Netzwerkfehler: mit den zuletzt gespeicherten Daten weiterarbeiten
+                    print(f"Warnung: Withings-Abgleich fehlgeschlagen ({e}), verwende vorhandene Daten")
+                else:
+                    if not synced:
+                        print("Warnung: Withings-Abgleich fehlgeschlagen, verwende vorhandene Daten")
+
+            signature = self._source_signature()
+            if signature == self._signature:
+                return False
+
+            try:
+                data = self._load(signature)
+            except (OSError, ValueError) as e:
+                # z.B. während eine Exportdatei gerade geschrieben wird: beim nächsten Mal erneut versuchen
+                print(f"Warnung: Daten konnten nicht neu geladen werden ({e}), verwende bisherige Daten")
+                return False
+
+            self.data = data.sorted()
+            self._signature = signature
+            self.version += 1
+            self._views.clear()
+            self._responses.clear()
+            print(f"Daten geladen: {len(self.data)} Messungen (Version {self.version})")
+            return True
+
+    def _range(self, params):
+        """Zeitraum aus den Parametern 'start'/'end' (Standard: Zeitraum des Analyzers)"""
+        start = params.get('start')
+        end = params.get('end')
+        start_time = parse_time_argument(start) if start else self.analyzer.start_time
+        end_time = parse_time_argument(end) if end else self.analyzer.end_time
+        return start_time, end_time
+
+    def view(self, start_time, end_time):
+        """
+        Analyzer-Kopie mit den Daten, Morgen- und Abendwerten eines Zeitraums
+
+        Args:
+            start_time: Beginn (datetime oder None)
+            end_time: Ende (datetime oder None)
+
+        Returns:
+            Tuple (Datenversion, BloodPressureAnalyzer)
+        """
+        self.refresh()
+        data, version = self.data, self.version
+        key = (version, start_time, end_time)
+        view = self._views.get(key)
+        if view is None:
+            result = analyze(data, start_time, end_time, self.analyzer.morning_window, self.analyzer.evening_window)
+            view = copy.copy(self._renderer)
+            view.start_time = start_time
+            view.end_time = end_time
+            view.bloodpressure_complete = result.complete
+            view.bloodpressure_morning = result.morning
+            view.bloodpressure_evening = result.evening
+            self._views.put(key, view)
+        return version, view
+
+    def stats(self, params):
+        """Anzahl, Mittelwert und Standardabweichung je Kategorie als Dictionary"""
+        start_time, end_time = self._range(params)
+        version, view = self.view(start_time, end_time)
+        stats = {'version': version}
+        stats.update(view.result().to_dict())
+        return stats
+
+    def _rendered(self, key, render):
+        """Liefert eine gerenderte Antwort aus dem Cache oder rendert sie (nacheinander)"""
+        body = self._responses.get(key)
+        if body is None:
+            with self._render_lock:
+                body = self._responses.get(key)
+                if body is None:
+                    try:
+                        body = render()
+                    finally:
+                        lazy_import('matplotlib.pyplot').close('all')
+                    self._responses.put(key, body)
+        return body
+
+    def chart(self, name, image_format, params):
+        """Rendert ein Diagramm (siehe CHARTS) als PNG oder SVG"""
+        start_time, end_time = self._range(params)
+        version, view = self.view(start_time, end_time)
+
+        def render():
+            sink = _FigureSink(image_format)
+            getattr(view, CHARTS[name])(sink)
+            return sink.buffer.getvalue()
+
+        return self._rendered((version, 'chart', name, image_format, start_time, end_time), render)
+
+    def pdf(self, params):
+        """Erstellt den PDF-Bericht des Zeitraums im Speicher"""
+        start_time, end_time = self._range(params)
+        version, view = self.view(start_time, end_time)
+
+        def render():
+            buffer = io.BytesIO()
+            view.create_pdf_report(buffer)
+            return buffer.getvalue()
+
+        return self._rendered((version, 'pdf', start_time, end_time), render)
+
+
+class ReportRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP API des Report Servers
+
+    GET /stats                      Statistiken (JSON)
+    GET /chart/<name>.<png|svg>     Diagramm (name: complete, morning_evening, average)
+    GET /report.pdf                 PDF-Bericht
+    Alle Endpunkte akzeptieren ?start=...&end=... (wie --start/--end).
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        """Behandelt GET Requests"""
+        parsed_path = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(parsed_path.query).items()}
+        service = self.server.service
+        path = parsed_path.path
+
+        try:
+            if path == '/stats':
+                self._send(200, json.dumps(service.stats(params)).encode(), 'application/json')
+            elif path == '/report.pdf':
+                self._send(200, service.pdf(params), 'application/pdf')
+            elif path.startswith('/chart/'):
+                name, _, image_format = Path(path).name.partition('.')
+                if name not in CHARTS or image_format not in CHART_FORMATS:
+                    self._send_error(404, f"Unbekanntes Diagramm: {Path(path).name}")
+                    return
+                self._send(200, service.chart(name, image_format, params), CHART_FORMATS[image_format])
+            else:
+                self._send_error(404, f"Unbekannter Pfad: {path}")
+        except ValueError as e:
+            self._send_error(400, f"Ungültiger Parameter: {e}")
+        except Exception as e:
+            # Fehler beim Auswerten oder Rendern: Antwort statt abgebrochener Verbindung
+            print(f"Fehler bei {self.path}: {e}")
+            self._send_error(500, f"Interner Fehler: {e}")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode(), 'application/json')
+
+    def log_message(self, format, *args):
+        """Unterdrücke Server-Log-Nachrichten"""
+        pass
+
+
+class ReportServer(ThreadingHTTPServer):
+    """HTTP Server mit zugehörigem ReportService"""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, service):
+        super().__init__(server_address, ReportRequestHandler)
+        self.service = service
+
+
+def serve(analyzer, port=DEFAULT_PORT, host='127.0.0.1', refresh_interval=DEFAULT_REFRESH_INTERVAL,
+          csv_patterns=None):
+    """
+    Startet den Report Server und blockiert bis KeyboardInterrupt
+
+    Args:
+        analyzer: Konfigurierter BloodPressureAnalyzer
+        port: TCP-Port
+        host: Adresse (Standard: nur lokal erreichbar)
+        refresh_interval: Mindestabstand zwischen zwei Prüfungen der Datenquelle (Sekunden)
+        csv_patterns: CSV-Dateien, Glob-Muster oder Verzeichnisse (werden bei jeder Prüfung neu erweitert)
+    """
+    service = ReportService(analyzer, refresh_interval, csv_patterns)
+    server = ReportServer((host, port), service)
+    print(f"Report Server läuft auf http://{host}:{server.server_address[1]} "
+          f"(/stats, /chart/<name>.<png|svg>, /report.pdf)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nReport Server beendet.")
+    finally:
+        server.server_close()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Rolling Stats
+Gleitende Mittelwerte, Standardabweichungen und Perzentile über Tagesfenster
+"""
+
+import numpy as np
+
+# Standard-Fensterlängen in Tagen und Perzentile
+DEFAULT_WINDOWS = (7, 30, 90)
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+
+def _cumulative(values, axis=0):
+    """Kumulierte Summe mit führender Null (Summe über [lo, hi) = c[hi] - c[lo])"""
+    shape = list(values.shape)
+    shape[axis] = 1
+    return np.concatenate((np.zeros(shape, dtype=values.dtype), np.cumsum(values, axis=axis)), axis=axis)
+
+
+def _value_levels(values):
+    """
+    Vorkommende Werte und Index jedes Werts darin (ganzzahlige Werte, O(n + Wertebereich))
+
+    Returns:
+        Tuple (sortierte vorkommende Werte, Index je Messung)
+    """
+    offset = int(values.min())
+    present = np.bincount(values - offset) > 0
+    lookup = np.cumsum(present) - 1
+    return np.flatnonzero(present) + offset, lookup[values - offset]
+
+
+class RollingStats:
+    """
+    Gleitende Statistiken je Fensterlänge auf einem Tagesraster
+
+    Für jeden Kalendertag (Ortszeit) vom ersten bis zum letzten Messtag
+    beschreibt ein Fenster von w Tagen alle Messungen dieses Tages und der
+    w - 1 Tage davor. Tage ohne Messungen im Fenster liefern NaN.
+
+    Attribute:
+        days: numpy Array der Tage (Tage seit 1970-01-01, Ortszeit)
+        windows: Fensterlängen in Tagen
+        percentiles: Perzentile (0-100)
+        counts: Dictionary Fensterlänge -> Anzahl Messungen je Tag
+        stats: Dictionary Fensterlänge -> Messgröße ('sys', 'dia', 'pulse') ->
+            Kennzahl ('mean', 'std', 'p10', ...) -> numpy Array je Tag
+    """
+
+    def __init__(self, days, windows, percentiles, counts, stats):
+        self.days = days
+        self.windows = tuple(windows)
+        self.percentiles = tuple(percentiles)
+        self.counts = counts
+        self.stats = stats
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def dates(self):
+        """Tage als numpy datetime64[D] (z.B. für matplotlib)"""
+        return self.days.astype('datetime64[D]')
+
+
+def rolling_stats(series, windows=DEFAULT_WINDOWS, percentiles=DEFAULT_PERCENTILES):
+    """
+    Berechnet gleitende Statistiken für SYS, DIA und Puls
+
+    Mittelwert und Standardabweichung ergeben sich aus kumulierten Tagessummen
+    von x und x² (Summe über ein Fenster = Differenz zweier kumulierter Werte),
+    die Perzentile (Nearest-Rank) aus kumulierten Tageshistogrammen über die
+    vorkommenden Werte. Laufzeit O(n) für die Tagessummen plus
+    O(Tage × verschiedene Werte) je Fenster, unabhängig von der Fensterlänge
+    und ohne Sortieren; vollständig vektorisiert.
+
+    Args:
+        series: MeasurementSeries (sortiert oder unsortiert)
+        windows: Fensterlängen in Tagen
+        percentiles: Perzentile (0-100)
+
+    Returns:
+        RollingStats
+    """
+    windows = tuple(int(window) for window in windows)
+    percentiles = tuple(percentiles)
+    if not series:
+        empty = np.empty(0, dtype=np.int64)
+        return RollingStats(empty, windows, percentiles, {window: empty for window in windows},
+                            {window: {} for window in windows})
+
+    day, _ = series.local_day_and_time()
+    first_day = int(day.min())
+    day_count = int(day.max()) - first_day + 1
+    day_index = day - first_day
+    days = np.arange(first_day, first_day + day_count)
+
+    # Fenster je Tag als Bereich [lo, hi) auf dem Tagesraster
+    hi = np.arange(1, day_count + 1)
+    lo = {window: np.maximum(hi - window, 0) for window in windows}
+    cumulative_counts = _cumulative(np.bincount(day_index, minlength=day_count))
+    counts = {window: cumulative_counts[hi] - cumulative_counts[lo[window]] for window in windows}
+
+    stats = {window: {} for window in windows}
+    for name in ('sys', 'dia', 'pulse'):
+        values = getattr(series, name).astype(np.int64)
+
+        # Um den gerundeten Mittelwert zentriert: Summen bleiben in float64 exakt
+        center = int(round(float(values.mean())))
+        centered = (values - center).astype(np.float64)
+        sums = _cumulative(np.bincount(day_index, weights=centered, minlength=day_count))
+        squares = _cumulative(np.bincount(day_index, weights=centered * centered, minlength=day_count))
+
+        levels, level_index = _value_levels(values)
+        histogram = np.bincount(day_index * len(levels) + level_index, minlength=day_count * len(levels))
+        cumulative_histogram = _cumulative(histogram.reshape(day_count, len(levels)).astype(np.int32))
+
+        for window in windows:
+            count = counts[window]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = (sums[hi] - sums[lo[window]]) / count
+                variance = (squares[hi] - squares[lo[window]]) / count - mean * mean
+            entry = {'mean': mean + center, 'std': np.sqrt(np.maximum(variance, 0))}
+
+            # Kumulierte Häufigkeiten der Werte im Fenster, Perzentil = erster Wert mit Rang >= q·n
+            window_counts = np.cumsum(cumulative_histogram[hi] - cumulative_histogram[lo[window]], axis=1)
+            for percentile in percentiles:
+                rank = np.maximum(np.ceil(count * (percentile / 100)), 1)
+                position = np.argmax(window_counts >= rank[:, None], axis=1)
+                entry[f'p{percentile}'] = np.where(count > 0, levels[position], np.nan)
+            stats[window][name] = entry
+
+    return RollingStats(days, windows, percentiles, counts, stats)
@@ -4,24 +4,97 @@ Withings API Client
 Integriert Withings Health API für automatischen Blutdruckdaten-Import
 """
 
+import collections
+import itertools
 import json
 import os
+import queue
+import random
 import time
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from urllib.parse import urlencode, urlparse, parse_qs
 import webbrowser
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("requests library nicht gefunden. Installiere mit: pip install requests")
     exit(1)
 
 
+class WithingsAPIError(Exception):
+    """Fehlerstatus (status != 0) in einer Antwort der Withings API"""
+    
+    def __init__(self, status, error):
+        super().__init__(f"Status {status}: {error}")
+        self.status = status
+        self.error = str(error)
+
+
+class TokenBucket:
+    """
+    Threadsicherer Token-Bucket zur Begrenzung der Anfragerate
+    
+    Pro Anfrage wird ein Token verbraucht; Tokens füllen sich mit 'rate'
+    pro Sekunde bis 'capacity' wieder auf. Ist kein Token verfügbar, wartet
+    acquire() bis zum nächsten.
+    """
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens pro Sekunde (dauerhaft erlaubte Anfragerate)
+            capacity: Maximale Anzahl Tokens (erlaubte kurze Spitze)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Wartet, bis ein Token verfügbar ist, und verbraucht es"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def shard_time_range(start_timestamp: int, end_timestamp: int, shards: int) -> List[Tuple[int, int]]:
+    """
+    Teilt einen Zeitraum in gleich lange Teilbereiche
+    
+    Benachbarte Teilbereiche teilen sich die Grenzsekunde (die API-Grenzen
+    sind inklusive); doppelt gelieferte Messgruppen werden beim Zusammenführen
+    über die grpid entfernt.
+    
+    Args:
+        start_timestamp: Beginn (Unix-Zeit)
+        end_timestamp: Ende (Unix-Zeit)
+        shards: Gewünschte Anzahl Teilbereiche
+        
+    Returns:
+        Liste von (Beginn, Ende) in zeitlicher Reihenfolge
+    """
+    span = max(0, end_timestamp - start_timestamp)
+    shards = max(1, min(shards, span))
+    bounds = [start_timestamp + span * i // shards for i in range(shards + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
 class OAuthCallbackHandler(BaseHTTPRequestHandler):
     """HTTP Request Handler für OAuth Callback"""
     
@@ -110,6 +183,58 @@ class OAuthCallbackServer(HTTPServer):
         self.auth_error = None
 
 
+class NotificationHandler(BaseHTTPRequestHandler):
+    """HTTP Request Handler für Withings Benachrichtigungen (notify callbacks)"""
+    
+    def do_POST(self):
+        """Nimmt eine Benachrichtigung entgegen und bestätigt sie sofort"""
+        parsed_path = urlparse(self.path)
+        if parsed_path.path != self.server.callback_path:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        length = int(self.headers.get('Content-Length', 0))
+        params = parse_qs(self.rfile.read(length).decode())
+        params.update(parse_qs(parsed_path.query))
+        
+        # Withings erwartet eine schnelle Antwort; abgerufen wird im Hintergrund
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+        
+        notification = {key: values[0] for key, values in params.items()}
+        self.server.notifications.put(notification)
+    
+    def do_GET(self):
+        """Bestätigt die Erreichbarkeitsprüfung der Callback-URL durch Withings"""
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    do_HEAD = do_GET
+    
+    def log_message(self, format, *args):
+        """Unterdrücke Server-Log-Nachrichten"""
+        pass
+
+
+class NotificationServer(OAuthCallbackServer):
+    """
+    Langlaufender HTTP Server für Withings Benachrichtigungen
+    
+    Nutzt die Server-Infrastruktur des OAuth Callbacks; eingehende
+    Benachrichtigungen werden in eine Queue gestellt und vom Client
+    abgearbeitet (siehe WithingsClient.run_notification_receiver).
+    """
+    
+    def __init__(self, server_address, callback_path: str = '/notify'):
+        super().__init__(server_address, NotificationHandler)
+        self.callback_path = callback_path
+        self.notifications = queue.Queue()
+
+
 class WithingsClient:
     """Client für Withings Health API"""
     
@@ -118,6 +243,38 @@ class WithingsClient:
     TOKEN_URL = "https://wbsapi.withings.net/v2/oauth2"
     API_BASE_URL = "https://wbsapi.withings.net"
     
+    # Überlappung beim inkrementellen Abgleich (Sekunden)
+    SYNC_OVERLAP_SECONDS = 300
+    
+    # Anfragerate (Withings erlaubt 120 Anfragen pro Minute)
+    RATE_LIMIT_PER_SECOND = 2.0
+    RATE_LIMIT_BURST = 4
+    
+    # Teilbereiche je Download-Thread beim parallelen Abruf (Lastausgleich bei
+    # ungleich verteilten Messungen; kleinere Teilbereiche senken den Speicherbedarf)
+    SHARDS_PER_WORKER = 4
+    
+    # Verbindungs- und Lese-Timeout je Anfrage (Sekunden)
+    DEFAULT_TIMEOUT = (5, 30)
+    
+    # Wiederholung vorübergehender Fehler mit exponentiellem Backoff
+    MAX_RETRIES = 4
+    BACKOFF_BASE_SECONDS = 0.5
+    BACKOFF_MAX_SECONDS = 30.0
+    RETRY_HTTP_STATUS = frozenset({429, 500, 502, 503, 504})
+    RETRY_API_STATUS = frozenset({601})  # Withings: Too Many Requests (HTTP 200)
+    
+    # Withings-Status bei ungültiger oder abgelaufener Autorisierung
+    AUTH_ERROR_STATUS = frozenset({100, 101, 102, 200, 401})
+    
+    # Gültigkeit der zwischengespeicherten Geräteliste (Sekunden)
+    DEVICE_CACHE_TTL = 7 * 24 * 3600
+    
+    # Benachrichtigungen: appli 4 = Blutdruck, Herzfrequenz
+    NOTIFY_APPLI_BLOOD_PRESSURE = 4
+    # Wartezeit zum Zusammenfassen kurz aufeinanderfolgender Benachrichtigungen
+    NOTIFY_COALESCE_SECONDS = 2.0
+    
     # Measure types für Blutdruckdaten
     MEASURE_TYPES = {
         'diastolic': 9,      # Diastolischer Blutdruck
@@ -125,7 +282,10 @@ class WithingsClient:
         'heart_rate': 11     # Herzfrequenz
     }
     
-    def __init__(self, client_id: str, client_secret: str, redirect_uri: str = "http://localhost:8080/callback"):
+    def __init__(self, client_id: str, client_secret: str, redirect_uri: str = "http://localhost:8080/callback",
+                 download_workers: int = 1, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 max_retries: int = MAX_RETRIES, api_base_url: Optional[str] = None,
+                 rate_limit: Optional[float] = RATE_LIMIT_PER_SECOND, record_file: Optional[str] = None):
         """
         Initialisiert den Withings Client
         
@@ -133,14 +293,42 @@ class WithingsClient:
             client_id: Withings App Client ID
             client_secret: Withings App Client Secret
             redirect_uri: OAuth Redirect URI
+            download_workers: Anzahl Threads für den Abruf eines Zeitraums
+                (> 1: Zeitraum wird aufgeteilt und parallel abgerufen)
+            timeout: (Verbindungs-Timeout, Lese-Timeout) je Anfrage in Sekunden
+            max_retries: Maximale Anzahl Wiederholungen vorübergehender Fehler
+            api_base_url: Abweichende Basis-URL der API (z.B. lokaler
+                withings_mock_server.py); Token-URL ist <api_base_url>/v2/oauth2
+            rate_limit: Maximale Anfragen pro Sekunde (None: unbegrenzt)
+            record_file: getmeas-Antworten als JSON-Zeilen an diese Datei anhängen
+                (Wiedergabe mit withings_mock_server.py --replay)
         """
         self.client_id = client_id
         self.client_secret = client_secret
         self.redirect_uri = redirect_uri
+        self.download_workers = download_workers
+        if api_base_url:
+            self.API_BASE_URL = api_base_url.rstrip('/')
+            self.TOKEN_URL = f"{self.API_BASE_URL}/v2/oauth2"
+        self.rate_limiter = TokenBucket(rate_limit, self.RATE_LIMIT_BURST) if rate_limit else None
+        self.record_file = record_file
+        self._record_lock = threading.Lock()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        
+        # Eine Session mit Keep-Alive-Verbindungspool für alle Anfragen
+        # (Pool groß genug für alle Download-Threads)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(10, download_workers))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.access_token = None
         self.refresh_token = None
         self.token_expires_at = None
         self.config_file = Path("withings_config.json")
+        self.device_cache_file = Path("withings_devices.json")
+        # Verhindert mehrfache Token-Erneuerung durch parallele Download-Threads
+        self._auth_lock = threading.Lock()
         
         # Lade gespeicherte Tokens
         self._load_tokens()
@@ -329,6 +517,82 @@ class WithingsClient:
                 print("Versuche es erneut...")
                 continue
     
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Wartezeit vor der nächsten Wiederholung
+        
+        Args:
+            attempt: Nummer des fehlgeschlagenen Versuchs (0 = erster Versuch)
+            retry_after: Wert des Retry-After Headers (Sekunden oder HTTP-Datum)
+            
+        Returns:
+            Wartezeit in Sekunden (Retry-After falls angegeben, sonst
+            exponentieller Backoff mit vollem Jitter)
+        """
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(0.0, delay), self.BACKOFF_MAX_SECONDS)
+        
+        return random.uniform(0, min(self.BACKOFF_MAX_SECONDS, self.BACKOFF_BASE_SECONDS * 2 ** attempt))
+    
+    def _post(self, url: str, data: Dict, headers: Optional[Dict] = None, idempotent: bool = True) -> Dict:
+        """
+        Sendet eine Anfrage über die gemeinsame Session und liefert die JSON-Antwort
+        
+        Vorübergehende Fehler (Verbindungsfehler, Timeouts, HTTP 429/5xx,
+        Withings-Status 601) werden bis zu max_retries mal mit Backoff
+        wiederholt. Jede Anfrage verbraucht ein Token des Ratenbegrenzers.
+        
+        Args:
+            url: Ziel-URL
+            data: Form-Daten
+            headers: Zusätzliche HTTP-Header
+            idempotent: False für Anfragen, die nicht doppelt ausgeführt werden
+                dürfen (Token-Austausch); dann wird nur wiederholt, wenn der
+                Server die Anfrage sicher nicht verarbeitet hat (Verbindungs-
+                aufbau fehlgeschlagen, HTTP 429/503, Status 601)
+            
+        Returns:
+            Antwort als Dictionary
+            
+        Raises:
+            requests.RequestException: Bei HTTP-Fehlern (nach allen Wiederholungen)
+            ValueError: Bei ungültigem JSON
+        """
+        retry_http_status = self.RETRY_HTTP_STATUS if idempotent else frozenset({429, 503})
+        
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                response = self.session.post(url, data=data, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                safe_to_retry = idempotent or isinstance(e, requests.ConnectTimeout)
+                if last_attempt or not safe_to_retry:
+                    raise
+                reason, retry_after = type(e).__name__, None
+            else:
+                if response.status_code in retry_http_status and not last_attempt:
+                    reason, retry_after = f"HTTP {response.status_code}", response.headers.get('Retry-After')
+                else:
+                    response.raise_for_status()
+                    result = response.json()
+                    if result.get('status') not in self.RETRY_API_STATUS or last_attempt:
+                        return result
+                    reason, retry_after = f"Status {result.get('status')}", None
+            
+            delay = self._retry_delay(attempt, retry_after)
+            print(f"⏳ {reason} - Wiederholung {attempt + 1}/{self.max_retries} in {delay:.1f} s")
+            time.sleep(delay)
+    
     def _exchange_code_for_token(self, auth_code: str) -> bool:
         """
         Tauscht Authorization Code gegen Access Token
@@ -352,13 +616,7 @@ class WithingsClient:
         print(f"🔄 Tausche Authorization Code gegen Access Token...")
         
         try:
-            response = requests.post(self.TOKEN_URL, data=data)
-            
-            print(f"📡 API Response Status: {response.status_code}")
-            print(f"📡 API Response Content: {response.text[:200]}...")
-            
-            response.raise_for_status()
-            token_data = response.json()
+            token_data = self._post(self.TOKEN_URL, data, idempotent=False)
             
             if token_data.get('status') == 0:  # Withings success status
                 body = token_data.get('body', {})
@@ -385,7 +643,6 @@ class WithingsClient:
             return False
         except ValueError as e:
             print(f"📄 JSON Parse Fehler: {e}")
-            print(f"📄 Response Content: {response.text}")
             return False
         except Exception as e:
             print(f"❌ Allgemeiner Fehler beim Token-Austausch: {e}")
@@ -410,10 +667,7 @@ class WithingsClient:
         }
         
         try:
-            response = requests.post(self.TOKEN_URL, data=data)
-            response.raise_for_status()
-            
-            token_data = response.json()
+            token_data = self._post(self.TOKEN_URL, data, idempotent=False)
             
             if token_data.get('status') == 0:
                 body = token_data.get('body', {})
@@ -451,127 +705,280 @@ class WithingsClient:
         
         return True
     
-    def get_blood_pressure_data(self, 
-                               start_date: datetime, 
-                               end_date: datetime) -> List[Dict]:
+    def connect(self, validate: bool = False) -> bool:
         """
-        Ruft Blutdruckdaten von Withings API ab
+        Stellt eine nutzbare Autorisierung her
+        
+        Ohne validate wird einem vorhandenen, nicht abgelaufenen Token
+        vertraut (kein API-Aufruf); ein abgelaufener Token wird erneuert.
+        Lehnt die API den Token später ab, wird beim ersten echten Abruf
+        erneuert bzw. neu autorisiert (siehe _post_authorized).
         
         Args:
-            start_date: Startdatum
-            end_date: Enddatum
+            validate: Verbindung zusätzlich per test_connection() prüfen
             
         Returns:
-            Liste mit Blutdruckdaten
+            True wenn der Client einsatzbereit ist
         """
-        if not self._ensure_valid_token():
-            print("Keine gültige Autorisierung. Führe zuerst authorize() aus.")
-            return []
+        ready = self.test_connection() if validate else self._ensure_valid_token()
+        if ready:
+            return True
         
-        # Konvertiere Datumsangaben zu Unix Timestamps
-        start_timestamp = int(start_date.timestamp())
-        end_timestamp = int(end_date.timestamp())
+        print("Withings API Autorisierung erforderlich...")
+        return self.authorize()
+    
+    def _auth_headers(self) -> Dict:
+        """HTTP-Header mit dem aktuellen Access Token"""
+        # Authorization Header verwenden anstatt oauth_token Parameter
+        return {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+    
+    def _renew_authorization(self, rejected_token: Optional[str]) -> bool:
+        """
+        Erneuert die Autorisierung, nachdem die API einen Token abgelehnt hat
         
-        print(f"🔍 Suche Blutdruckdaten von {start_date.strftime('%Y-%m-%d')} bis {end_date.strftime('%Y-%m-%d')}")
+        Args:
+            rejected_token: Der abgelehnte Access Token
+            
+        Returns:
+            True wenn ein neuer Token verfügbar ist
+        """
+        with self._auth_lock:
+            if self.access_token != rejected_token:
+                # Bereits von einem anderen Thread erneuert
+                return bool(self.access_token)
+            
+            print("🔑 Withings API hat den Access Token abgelehnt. Erneuere...")
+            if self._refresh_access_token():
+                return True
+            print("Withings API Autorisierung erforderlich...")
+            return self.authorize()
+    
+    def _post_authorized(self, url: str, data: Dict) -> Dict:
+        """
+        Sendet eine API-Anfrage mit Access Token
         
+        Lehnt die API den Token ab (HTTP 401 oder Withings-Auth-Status), wird
+        der Token einmalig erneuert (Refresh, sonst neue Autorisierung) und
+        die Anfrage wiederholt.
+        
+        Args:
+            url: Ziel-URL
+            data: Form-Daten
+            
+        Returns:
+            Antwort als Dictionary
+        """
+        def send():
+            try:
+                return self._post(url, data, self._auth_headers())
+            except requests.HTTPError as e:
+                if e.response is not None and e.response.status_code == 401:
+                    return {'status': 401, 'error': 'HTTP 401 Unauthorized'}
+                raise
+        
+        token = self.access_token
+        result = send()
+        if result.get('status') in self.AUTH_ERROR_STATUS and self._renew_authorization(token):
+            result = send()
+        return result
+    
+    def _record_response(self, result: Dict):
+        """Hängt eine API-Antwort als JSON-Zeile an die Aufzeichnungsdatei an"""
+        line = json.dumps(result) + '\n'
+        with self._record_lock:
+            with open(self.record_file, 'a') as f:
+                f.write(line)
+    
+    def iter_measure_groups(self,
+                            start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None,
+                            lastupdate: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Ruft die Messgruppen seitenweise von der Withings API ab (Generator)
+
+        Folgt den Feldern 'more' und 'offset' der getmeas-Antwort. Es wird
+        immer nur eine Seite im Speicher gehalten; die Gruppen einer Seite
+        werden geliefert, bevor die nächste Seite angefordert wird.
+
+        Args:
+            start_date: Startdatum
+            end_date: Enddatum
+            lastupdate: Nur seit diesem Unix-Zeitpunkt neue oder geänderte
+                Messgruppen abrufen (anstelle von start_date/end_date)
+
+        Yields:
+            Rohe Messgruppen ('measuregrps') der Withings API
+
+        Raises:
+            WithingsAPIError: Bei einem Fehlerstatus der API
+            requests.RequestException: Bei HTTP-Fehlern (nach allen Wiederholungen)
+        """
         # API Request Parameter für Withings v2 API
         data = {
             'action': 'getmeas',
-            'startdate': start_timestamp,
-            'enddate': end_timestamp,
             'meastypes': ','.join(map(str, self.MEASURE_TYPES.values())),  # 9,10,11
             'category': 1,  # Real measurements (nicht geschätzt)
         }
-        
-        # Authorization Header verwenden anstatt oauth_token Parameter
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
+        if lastupdate is not None:
+            data['lastupdate'] = int(lastupdate)
+        else:
+            data['startdate'] = int(start_date.timestamp())
+            data['enddate'] = int(end_date.timestamp())
         
         # Debug-Ausgabe
         print(f"📡 API Request URL: {self.API_BASE_URL}/measure")
         print(f"📡 API Request Data: {data}")
-        print(f"📡 API Request Headers: Authorization: Bearer {self.access_token[:20]}...")
         
-        try:
+        page = 0
+        while True:
+            page += 1
             # POST Request anstatt GET für Withings v2 API
-            response = requests.post(f"{self.API_BASE_URL}/measure", data=data, headers=headers)
+            result = self._post_authorized(f"{self.API_BASE_URL}/measure", data)
+            if self.record_file:
+                self._record_response(result)
             
-            print(f"📡 API Response Status: {response.status_code}")
-            print(f"📡 API Response Content: {response.text[:300]}...")
+            if result.get('status') != 0:
+                raise WithingsAPIError(result.get('status'), result.get('error', 'Unbekannter Fehler'))
             
-            response.raise_for_status()
-            data = response.json()
+            body = result.get('body', {})
+            groups = body.get('measuregrps', [])
+            print(f"✅ Seite {page}: {len(groups)} Messgruppen")
+            yield from groups
             
-            if data.get('status') == 0:
-                measurements = data.get('body', {}).get('measuregrps', [])
-                print(f"✅ {len(measurements)} Messgrupppen gefunden")
-                processed_data = self._process_blood_pressure_data(measurements)
-                
-                if not processed_data:
-                    print("⚠️  Keine Blutdruckmessungen in den gefundenen Daten")
-                    print("💡 Überprüfe:")
-                    print("   - Sind Blutdruckmessungen im angegebenen Zeitraum vorhanden?")
-                    print("   - Sind die Messungen mit einem Withings Blutdruckmessgerät gemacht?")
-                    print("   - Sind die Daten in der Withings Health Mate App sichtbar?")
-                
-                return processed_data
-            else:
-                error_msg = data.get('error', 'Unbekannter Fehler')
-                print(f"❌ Withings API Fehler: {error_msg}")
-                print(f"📄 Status Code: {data.get('status')}")
-                
-                # Spezifische Fehlermeldungen
-                if 'Invalid Params' in error_msg:
-                    print("💡 Mögliche Ursachen:")
-                    print("   - OAuth Token ungültig oder abgelaufen")
-                    print("   - Zeitstempel-Format inkorrekt")
-                    print("   - Fehlende API-Berechtigung")
-                
-                return []
-                
+            if not body.get('more') or 'offset' not in body:
+                break
+            data['offset'] = body['offset']
+    
+    def iter_range_groups(self, start_date: datetime, end_date: datetime) -> Iterator[Dict]:
+        """
+        Ruft die Messgruppen eines Zeitraums ab, bei download_workers > 1 parallel
+        
+        Der Zeitraum wird in Teilbereiche zerlegt, die von einem Thread-Pool
+        abgerufen werden (alle Threads teilen sich den Ratenbegrenzer). Die
+        Teilbereiche werden in zeitlicher Reihenfolge geliefert; Messgruppen
+        an den Grenzen werden über die grpid nur einmal geliefert.
+        
+        Ein Teilbereich wird vollständig abgerufen, bevor er geliefert wird.
+        Damit nicht der gesamte Zeitraum im Speicher liegt, sind höchstens
+        download_workers Teilbereiche gleichzeitig in Arbeit; der nächste
+        wird erst angefordert, wenn der älteste geliefert wird. Der
+        Speicherbedarf liegt so bei etwa download_workers + 1 Teilbereichen
+        (ca. 1/SHARDS_PER_WORKER des Zeitraums) statt bei allen Messgruppen;
+        verarbeitet der Aufrufer langsamer als abgerufen wird, warten die
+        Threads entsprechend.
+        
+        Args:
+            start_date: Startdatum
+            end_date: Enddatum
+            
+        Yields:
+            Rohe Messgruppen ('measuregrps') der Withings API
+        """
+        if self.download_workers <= 1:
+            yield from self.iter_measure_groups(start_date, end_date)
+            return
+        
+        shards = shard_time_range(int(start_date.timestamp()), int(end_date.timestamp()),
+                                  self.download_workers * self.SHARDS_PER_WORKER)
+        print(f"⚡ Parallel-Abruf: {len(shards)} Teilbereiche mit {self.download_workers} Threads")
+        
+        def fetch_shard(bounds):
+            shard_start, shard_end = (datetime.fromtimestamp(value, tz=timezone.utc) for value in bounds)
+            return list(self.iter_measure_groups(shard_start, shard_end))
+        
+        seen = set()
+        remaining = iter(shards)
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            pending = collections.deque(executor.submit(fetch_shard, bounds)
+                                        for bounds in itertools.islice(remaining, self.download_workers))
+            try:
+                while pending:
+                    groups = pending.popleft().result()
+                    # Nächsten Teilbereich erst jetzt anfordern (begrenzter Vorlauf)
+                    for bounds in itertools.islice(remaining, 1):
+                        pending.append(executor.submit(fetch_shard, bounds))
+                    for group in groups:
+                        grpid = group.get('grpid')
+                        if grpid is not None:
+                            if grpid in seen:
+                                continue
+                            seen.add(grpid)
+                        yield group
+            finally:
+                # Bei Abbruch (Fehler oder vorzeitig geschlossener Generator) nichts mehr abrufen
+                for future in pending:
+                    future.cancel()
+    
+    def get_blood_pressure_data(self, 
+                               start_date: datetime, 
+                               end_date: datetime) -> List[Dict]:
+        """
+        Ruft Blutdruckdaten von Withings API ab
+        
+        Die Seiten der API werden nacheinander abgerufen und direkt
+        verarbeitet (siehe iter_measure_groups und iter_range_groups).
+        
+        Args:
+            start_date: Startdatum
+            end_date: Enddatum
+            
+        Returns:
+            Liste mit Blutdruckdaten
+        """
+        if not self._ensure_valid_token():
+            print("Keine gültige Autorisierung. Führe zuerst authorize() aus.")
+            return []
+        
+        print(f"🔍 Suche Blutdruckdaten von {start_date.strftime('%Y-%m-%d')} bis {end_date.strftime('%Y-%m-%d')}")
+        
+        try:
+            processed_data = self._process_blood_pressure_data(self.iter_range_groups(start_date, end_date))
+        except WithingsAPIError as e:
+            print(f"❌ Withings API Fehler: {e.error}")
+            print(f"📄 Status Code: {e.status}")
+            
+            # Spezifische Fehlermeldungen
+            if 'Invalid Params' in e.error:
+                print("💡 Mögliche Ursachen:")
+                print("   - OAuth Token ungültig oder abgelaufen")
+                print("   - Zeitstempel-Format inkorrekt")
+                print("   - Fehlende API-Berechtigung")
+            
+            return []
         except requests.RequestException as e:
             print(f"🌐 HTTP Fehler beim Datenabruf: {e}")
             return []
         except ValueError as e:
             print(f"📄 JSON Parse Fehler: {e}")
-            print(f"📄 Response Content: {response.text}")
             return []
         except Exception as e:
             print(f"❌ Allgemeiner Fehler beim Datenabruf: {e}")
             return []
+        
+        if not processed_data:
+            print("⚠️  Keine Blutdruckmessungen in den gefundenen Daten")
+            print("💡 Überprüfe:")
+            print("   - Sind Blutdruckmessungen im angegebenen Zeitraum vorhanden?")
+            print("   - Sind die Messungen mit einem Withings Blutdruckmessgerät gemacht?")
+            print("   - Sind die Daten in der Withings Health Mate App sichtbar?")
+        
+        return processed_data
     
-    def _process_blood_pressure_data(self, measurements: List[Dict]) -> List[Dict]:
+    def _process_blood_pressure_data(self, measurements: Iterable[Dict]) -> List[Dict]:
         """
         Verarbeitet rohe Withings Messdaten zu strukturierten Blutdruckdaten
         
         Args:
-            measurements: Rohe Withings API Daten
+            measurements: Rohe Withings API Daten (Liste oder Generator wie
+                iter_measure_groups, wird in einem Durchgang gelesen)
             
         Returns:
             Strukturierte Blutdruckdaten
         """
-        processed_data = []
-        
-        for group in measurements:
-            timestamp = datetime.fromtimestamp(group['date'], tz=timezone.utc)
-            measures = {m['type']: m['value'] * (10 ** m['unit']) for m in group['measures']}
-            
-            # Suche nach Blutdruckdaten in dieser Messung
-            systolic = measures.get(self.MEASURE_TYPES['systolic'])
-            diastolic = measures.get(self.MEASURE_TYPES['diastolic'])
-            heart_rate = measures.get(self.MEASURE_TYPES['heart_rate'])
-            
-            # Nur hinzufügen wenn Blutdruckdaten vorhanden
-            if systolic is not None and diastolic is not None:
-                entry = {
-                    'timestamp': timestamp,
-                    'sys': int(systolic),
-                    'dia': int(diastolic),
-                    'pulse': int(heart_rate) if heart_rate is not None else 0
-                }
-                processed_data.append(entry)
+        processed_data = [entry for entry in map(self._parse_measure_group, measurements) if entry]
         
         # Sortiere nach Zeitstempel
         processed_data.sort(key=lambda x: x['timestamp'])
@@ -579,64 +986,336 @@ class WithingsClient:
         print(f"{len(processed_data)} Blutdruckmessungen von Withings API abgerufen")
         return processed_data
     
-    def test_connection(self) -> bool:
+    def _parse_measure_group(self, group: Dict) -> Optional[Dict]:
         """
-        Testet die Verbindung zur Withings API
+        Wandelt eine rohe Messgruppe in eine Blutdruckmessung um
         
+        Args:
+            group: Messgruppe der Withings API
+            
         Returns:
-            True wenn Verbindung erfolgreich
+            Dictionary mit 'grpid', 'timestamp', 'sys', 'dia', 'pulse' oder
+            None, falls die Gruppe keine Blutdruckwerte enthält
+        """
+        measures = {m['type']: m['value'] * (10 ** m['unit']) for m in group['measures']}
+        
+        # Suche nach Blutdruckdaten in dieser Messung
+        systolic = measures.get(self.MEASURE_TYPES['systolic'])
+        diastolic = measures.get(self.MEASURE_TYPES['diastolic'])
+        heart_rate = measures.get(self.MEASURE_TYPES['heart_rate'])
+        
+        # Nur übernehmen wenn Blutdruckdaten vorhanden
+        if systolic is None or diastolic is None:
+            return None
+        
+        return {
+            'grpid': group.get('grpid'),
+            'timestamp': datetime.fromtimestamp(group['date'], tz=timezone.utc),
+            'sys': int(systolic),
+            'dia': int(diastolic),
+            'pulse': int(heart_rate) if heart_rate is not None else 0
+        }
+    
+    def sync_measurements(self, store, start_date: datetime) -> bool:
+        """
+        Gleicht einen lokalen Messwert-Speicher inkrementell mit der API ab
+        
+        Beim ersten Abgleich wird der Zeitraum ab start_date abgerufen.
+        Danach werden per 'lastupdate' nur neue oder geänderte Messgruppen
+        seit dem letzten Abgleich abgerufen; liegt start_date vor dem bisher
+        abgeglichenen Zeitraum, zusätzlich nur die Lücke bis zu dessen Beginn.
+        
+        Args:
+            store: MeasurementStore (siehe measurement_store.py)
+            start_date: Beginn des benötigten Zeitraums
+            
+        Returns:
+            True wenn der Abgleich erfolgreich war
         """
         if not self._ensure_valid_token():
+            print("Keine gültige Autorisierung. Führe zuerst authorize() aus.")
             return False
         
-        # Teste mit einem einfachen API Call - verwende user endpoint
-        data = {
-            'action': 'getdevice'
-        }
+        start_timestamp = int(start_date.timestamp())
+        lastupdate = store.get_state('lastupdate')
+        synced_from = store.get_state('synced_from')
+        # Überlappung gegen Uhrzeit-Abweichungen; doppelte Gruppen überschreiben sich
+        sync_time = int(time.time()) - self.SYNC_OVERLAP_SECONDS
         
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
+        if lastupdate is None or synced_from is None:
+            print(f"🔄 Vollständiger Abgleich ab {start_date.strftime('%Y-%m-%d')}")
+            groups = self.iter_range_groups(start_date, datetime.now(timezone.utc))
+            synced_from = start_timestamp
+        else:
+            since = datetime.fromtimestamp(lastupdate).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"🔄 Inkrementeller Abgleich (Änderungen seit {since})")
+            groups = self.iter_measure_groups(lastupdate=lastupdate)
+            if start_timestamp < synced_from:
+                # Nur die Lücke vor dem bisher abgeglichenen Zeitraum abrufen
+                gap_end = datetime.fromtimestamp(synced_from, tz=timezone.utc)
+                print(f"🔄 Abgleich der Lücke {start_date.strftime('%Y-%m-%d')} bis {gap_end.strftime('%Y-%m-%d')}")
+                groups = itertools.chain(self.iter_range_groups(start_date, gap_end), groups)
+                synced_from = start_timestamp
         
-        print("🔗 Teste Withings API Verbindung...")
+        entries = filter(None, map(self._parse_measure_group, groups))
+        try:
+            count = store.upsert(entries, state={'lastupdate': sync_time, 'synced_from': synced_from})
+        except WithingsAPIError as e:
+            print(f"❌ Withings API Fehler beim Abgleich: {e.error}")
+            return False
+        except requests.RequestException as e:
+            print(f"🌐 HTTP Fehler beim Abgleich: {e}")
+            return False
+        except ValueError as e:
+            print(f"📄 JSON Parse Fehler beim Abgleich: {e}")
+            return False
+        
+        print(f"✅ {count} neue oder geänderte Blutdruckmessungen übernommen")
+        return True
+    
+    def sync_window(self, store, start_timestamp: int, end_timestamp: int) -> int:
+        """
+        Ruft nur einen Zeitraum ab und übernimmt ihn in den lokalen Speicher
+        
+        Der Zeitpunkt des letzten vollständigen Abgleichs ('lastupdate')
+        bleibt unverändert.
+        
+        Args:
+            store: MeasurementStore
+            start_timestamp: Beginn (Unix-Zeit)
+            end_timestamp: Ende (Unix-Zeit)
+            
+        Returns:
+            Anzahl übernommener Messungen
+            
+        Raises:
+            WithingsAPIError: Bei einem Fehlerstatus der API
+            requests.RequestException: Bei HTTP-Fehlern
+        """
+        groups = self.iter_range_groups(datetime.fromtimestamp(start_timestamp, tz=timezone.utc),
+                                        datetime.fromtimestamp(end_timestamp, tz=timezone.utc))
+        return store.upsert(filter(None, map(self._parse_measure_group, groups)))
+    
+    def subscribe_notifications(self, callback_url: str, appli: int = NOTIFY_APPLI_BLOOD_PRESSURE) -> bool:
+        """
+        Abonniert Withings Benachrichtigungen für neue Messungen
         
+        Args:
+            callback_url: Öffentlich erreichbare URL, die auf den lokalen
+                Benachrichtigungs-Server weitergeleitet wird
+            appli: Art der Daten (4 = Blutdruck)
+            
+        Returns:
+            True wenn das Abonnement eingerichtet wurde
+        """
+        if not self._ensure_valid_token():
+            return False
+        
+        data = {'action': 'subscribe', 'callbackurl': callback_url, 'appli': appli}
         try:
-            response = requests.post(f"{self.API_BASE_URL}/v2/user", data=data, headers=headers)
-            
-            print(f"📡 Test Response Status: {response.status_code}")
-            print(f"📡 Test Response Content: {response.text[:200]}...")
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('status') == 0:
-                print("✅ Withings API Verbindung erfolgreich!")
-                devices = data.get('body', {}).get('devices', [])
-                if devices:
-                    print(f"📱 {len(devices)} Gerät(e) gefunden:")
-                    for device in devices:
-                        device_type = device.get('type', 'Unbekannt')
-                        model = device.get('model', 'Unbekannt')
-                        print(f"   - {device_type}: {model}")
-                return True
-            else:
-                error_msg = data.get('error', 'Unbekannter Fehler')
-                print(f"❌ API Test fehlgeschlagen: {error_msg}")
-                
-                # Spezifische Hilfe bei häufigen Fehlern
-                if 'Invalid Params' in error_msg:
-                    print("💡 Mögliche Lösung: Token neu generieren")
-                    print("   Führe 'python withings_client.py' aus und autorisiere erneut")
+            result = self._post_authorized(f"{self.API_BASE_URL}/notify", data)
+        except requests.RequestException as e:
+            print(f"🌐 HTTP Fehler beim Abonnieren der Benachrichtigungen: {e}")
+            return False
+        
+        if result.get('status') != 0:
+            print(f"❌ Abonnement fehlgeschlagen: {result.get('error', 'Unbekannter Fehler')}")
+            return False
+        
+        print(f"✅ Benachrichtigungen abonniert: {callback_url}")
+        return True
+    
+    def run_notification_receiver(self, store, port: int, callback_path: str = '/notify',
+                                  callback_url: Optional[str] = None, on_update=None,
+                                  stop_event: Optional[threading.Event] = None):
+        """
+        Empfängt Withings Benachrichtigungen und gleicht nur den betroffenen Zeitraum ab
+        
+        Läuft bis KeyboardInterrupt bzw. bis stop_event gesetzt ist. Kurz
+        aufeinanderfolgende Benachrichtigungen werden zu einem Abruf
+        zusammengefasst. Enthält eine Benachrichtigung keinen Zeitraum, wird
+        inkrementell per lastupdate abgeglichen. Fehler beim Abgleich oder in
+        on_update werden ausgegeben, der Empfang läuft weiter.
+        
+        Args:
+            store: MeasurementStore
+            port: Lokaler Port des Benachrichtigungs-Servers
+            callback_path: Pfad der Callback-URL
+            callback_url: Falls angegeben, wird dieses Ziel zuerst abonniert
+            on_update: Optionale Funktion, nach jedem Abgleich mit der Anzahl
+                übernommener Messungen aufgerufen (None bei inkrementellem Abgleich)
+            stop_event: Optionales threading.Event zum Beenden
+        """
+        server = NotificationServer(('', port), callback_path)
+        server_thread = threading.Thread(target=server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        print(f"📬 Warte auf Withings Benachrichtigungen auf Port {server.server_address[1]}{callback_path}")
+        
+        if callback_url:
+            self.subscribe_notifications(callback_url)
+        
+        stop_event = stop_event or threading.Event()
+        try:
+            while not stop_event.is_set():
+                try:
+                    notifications = [server.notifications.get(timeout=0.5)]
+                except queue.Empty:
+                    continue
                 
-                return False
+                # Weitere Benachrichtigungen kurz sammeln und gemeinsam abrufen
+                deadline = time.monotonic() + self.NOTIFY_COALESCE_SECONDS
+                while time.monotonic() < deadline:
+                    try:
+                        notifications.append(server.notifications.get(timeout=deadline - time.monotonic()))
+                    except (queue.Empty, ValueError):
+                        break
                 
+                self._handle_notifications(store, notifications, on_update)
+        except KeyboardInterrupt:
+            print("\nBenachrichtigungs-Empfang beendet.")
+        finally:
+            server.shutdown()
+            server.server_close()
+            server_thread.join(timeout=5)
+    
+    def _handle_notifications(self, store, notifications: List[Dict], on_update=None):
+        """Gleicht den Zeitraum aller gesammelten Benachrichtigungen ab"""
+        windows = []
+        for notification in notifications:
+            try:
+                windows.append((int(notification['startdate']), int(notification['enddate'])))
+            except (KeyError, ValueError):
+                windows = None
+                break
+        
+        try:
+            if windows:
+                start_timestamp = min(start for start, _ in windows)
+                end_timestamp = max(end for _, end in windows)
+                print(f"📬 {len(notifications)} Benachrichtigung(en): "
+                      f"{datetime.fromtimestamp(start_timestamp).strftime('%Y-%m-%d %H:%M:%S')} bis "
+                      f"{datetime.fromtimestamp(end_timestamp).strftime('%Y-%m-%d %H:%M:%S')}")
+                count = self.sync_window(store, start_timestamp, end_timestamp)
+                print(f"✅ {count} neue oder geänderte Blutdruckmessungen übernommen")
+            else:
+                print(f"📬 {len(notifications)} Benachrichtigung(en) ohne Zeitraum - inkrementeller Abgleich")
+                synced_from = store.get_state('synced_from')
+                start_date = datetime.fromtimestamp(synced_from, tz=timezone.utc) if synced_from else datetime.now(timezone.utc)
+                if not self.sync_measurements(store, start_date):
+                    return
+                count = None
+        except WithingsAPIError as e:
+            print(f"❌ Withings API Fehler beim Abgleich: {e.error}")
+            return
+        except requests.RequestException as e:
+            print(f"🌐 HTTP Fehler beim Abgleich: {e}")
+            return
+        except ValueError as e:
+            print(f"📄 JSON Parse Fehler beim Abgleich: {e}")
+            return
+        except Exception as e:
+            # z.B. sqlite3.Error des lokalen Speichers: Empfang trotzdem fortsetzen
+            print(f"❌ Unerwarteter Fehler beim Abgleich: {e}")
+            return
+        
+        if on_update:
+            try:
+                on_update(count)
+            except Exception as e:
+                # z.B. vom PDF-Betrachter gesperrte Berichtsdatei: beim nächsten Abgleich erneut versuchen
+                print(f"❌ Fehler beim Aktualisieren nach dem Abgleich: {e}")
+    
+    def _load_device_cache(self) -> Optional[Dict]:
+        """Lädt die zwischengespeicherte Geräteliste ({'fetched_at', 'devices'}) oder None"""
+        try:
+            with open(self.device_cache_file, 'r') as f:
+                cache = json.load(f)
+            return cache if 'fetched_at' in cache and 'devices' in cache else None
+        except (OSError, ValueError):
+            return None
+    
+    def _save_device_cache(self, devices: List[Dict]):
+        """Speichert die Geräteliste mit Abrufzeitpunkt"""
+        try:
+            tmp_file = self.device_cache_file.with_name(self.device_cache_file.name + '.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({'fetched_at': time.time(), 'devices': devices}, f, indent=2)
+            os.replace(tmp_file, self.device_cache_file)
+        except OSError as e:
+            print(f"Fehler beim Speichern der Geräteliste: {e}")
+    
+    def get_devices(self, max_age: float = DEVICE_CACHE_TTL) -> List[Dict]:
+        """
+        Liefert die Geräte des Kontos (getdevice), zwischengespeichert auf der Festplatte
+        
+        Args:
+            max_age: Maximales Alter der gespeicherten Liste in Sekunden
+                (0: immer von der API abrufen)
+            
+        Returns:
+            Liste der Geräte
+            
+        Raises:
+            WithingsAPIError: Bei einem Fehlerstatus der API
+            requests.RequestException: Bei HTTP-Fehlern
+        """
+        cache = self._load_device_cache()
+        if cache and time.time() - cache['fetched_at'] < max_age:
+            return cache['devices']
+        
+        # Einfacher API Call - verwende user endpoint
+        result = self._post_authorized(f"{self.API_BASE_URL}/v2/user", {'action': 'getdevice'})
+        if result.get('status') != 0:
+            raise WithingsAPIError(result.get('status'), result.get('error', 'Unbekannter Fehler'))
+        
+        devices = result.get('body', {}).get('devices', [])
+        self._save_device_cache(devices)
+        return devices
+    
+    @staticmethod
+    def print_devices(devices: List[Dict]):
+        """Gibt die Geräteliste aus"""
+        if devices:
+            print(f"📱 {len(devices)} Gerät(e) gefunden:")
+            for device in devices:
+                device_type = device.get('type', 'Unbekannt')
+                model = device.get('model', 'Unbekannt')
+                print(f"   - {device_type}: {model}")
+    
+    def test_connection(self) -> bool:
+        """
+        Testet die Verbindung zur Withings API
+        
+        Returns:
+            True wenn Verbindung erfolgreich
+        """
+        if not self._ensure_valid_token():
+            return False
+        
+        print("🔗 Teste Withings API Verbindung...")
+        
+        try:
+            devices = self.get_devices(max_age=0)
+        except WithingsAPIError as e:
+            print(f"❌ API Test fehlgeschlagen: {e.error}")
+            
+            # Spezifische Hilfe bei häufigen Fehlern
+            if 'Invalid Params' in e.error:
+                print("💡 Mögliche Lösung: Token neu generieren")
+                print("   Führe 'python withings_client.py' aus und autorisiere erneut")
+            
+            return False
         except requests.RequestException as e:
             print(f"🌐 HTTP Fehler beim Verbindungstest: {e}")
             return False
         except Exception as e:
             print(f"❌ Allgemeiner Fehler beim Verbindungstest: {e}")
             return False
+        
+        print("✅ Withings API Verbindung erfolgreich!")
+        self.print_devices(devices)
+        return True
 
 
 def setup_withings_api():
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Withings Mock Server
+Lokaler Ersatz der Withings API für Tests und Benchmarks ohne Netzwerk
+
+Unterstützt Token-Austausch und -Erneuerung (/v2/oauth2), getmeas mit
+Seiten (more/offset), Zeitraum und lastupdate (/measure), getdevice
+(/v2/user) sowie das Abonnieren von Benachrichtigungen (/notify), die bei
+neuen Messungen an die Callback-URLs gesendet werden. Latenz,
+Ratenbegrenzung (Status 601), zufällige Serverfehler (HTTP 503 mit
+Retry-After) und ablaufende Tokens sind einstellbar. Statt synthetischer
+Messungen können aufgezeichnete getmeas-Antworten
+(WithingsClient(record_file=...)) wiedergegeben werden.
+"""
+
+import argparse
+import bisect
+import json
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode
+
+# Standardwerte
+DEFAULT_PORT = 8090
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_TOKEN_LIFETIME = 10800  # Sekunden (wie Withings: 3 Stunden)
+DEFAULT_START = 1609459200  # 2021-01-01 00:00:00 UTC
+
+# Withings Measure types
+_DIASTOLIC, _SYSTOLIC, _HEART_RATE = 9, 10, 11
+
+# Geräteliste für getdevice
+MOCK_DEVICES = [{'type': 'Blood Pressure Monitor', 'model': 'BPM Connect', 'deviceid': 'mock'}]
+
+
+def generate_groups(count: int, start: int = DEFAULT_START, seed: int = 0) -> List[Dict]:
+    """
+    Erzeugt synthetische Messgruppen (morgens und abends je eine Messung)
+
+    Args:
+        count: Anzahl Messgruppen
+        start: Unix-Zeit des ersten Tages
+        seed: Startwert des Zufallsgenerators
+
+    Returns:
+        Liste von Messgruppen wie in 'measuregrps', zeitlich sortiert
+    """
+    rng = random.Random(seed)
+    groups = []
+    for grpid in range(count):
+        day, evening = divmod(grpid, 2)
+        date = start + day * 86400 + (19 if evening else 7) * 3600 + rng.randint(-3600, 3600)
+        groups.append({
+            'grpid': grpid + 1,
+            'attrib': 0,
+            'date': date,
+            'created': date,
+            'modified': date,
+            'category': 1,
+            'measures': [
+                {'value': rng.randint(70, 95), 'type': _DIASTOLIC, 'unit': 0},
+                {'value': rng.randint(110, 150), 'type': _SYSTOLIC, 'unit': 0},
+                {'value': rng.randint(55, 90), 'type': _HEART_RATE, 'unit': 0}
+            ]
+        })
+    return groups
+
+
+def load_recorded_groups(path) -> List[Dict]:
+    """
+    Liest aufgezeichnete getmeas-Antworten (eine JSON-Antwort pro Zeile)
+
+    Args:
+        path: Aufzeichnungsdatei (siehe WithingsClient record_file)
+
+    Returns:
+        Alle enthaltenen Messgruppen, eindeutig je grpid
+    """
+    groups = {}
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                for group in json.loads(line).get('body', {}).get('measuregrps', []):
+                    groups[group.get('grpid', len(groups))] = group
+    return list(groups.values())
+
+
+class MockWithingsServer(ThreadingHTTPServer):
+    """HTTP Server mit dem Zustand der simulierten Withings API"""
+
+    daemon_threads = True
+
+    def __init__(self, address, groups: List[Dict], page_size: int = DEFAULT_PAGE_SIZE,
+                 latency: float = 0.0, rate_limit: Optional[float] = None,
+                 token_lifetime: int = DEFAULT_TOKEN_LIFETIME, error_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            address: (Host, Port), Port 0 wählt einen freien Port
+            groups: Messgruppen (siehe generate_groups / load_recorded_groups)
+            page_size: Messgruppen pro getmeas-Seite
+            latency: Zusätzliche Antwortzeit je Anfrage (Sekunden)
+            rate_limit: Erlaubte Anfragen pro Sekunde (darüber Status 601), None = unbegrenzt
+            token_lifetime: Gültigkeit ausgegebener Access Tokens (Sekunden)
+            error_rate: Anteil der Anfragen, die mit HTTP 503 beantwortet werden
+            seed: Startwert für die zufälligen Serverfehler
+        """
+        super().__init__(address, MockWithingsHandler)
+        self.groups = sorted(groups, key=lambda group: group['date'])
+        self._dates = [group['date'] for group in self.groups]
+        self.page_size = page_size
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.token_lifetime = token_lifetime
+        self.error_rate = error_rate
+        self.stats = Counter()
+        self.callback_urls = set()
+        self._random = random.Random(seed)
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    @property
+    def url(self) -> str:
+        """Basis-URL für WithingsClient(api_base_url=...)"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def issue_token(self) -> Dict:
+        """Gibt ein neues Token-Paar aus (Body wie bei requesttoken)"""
+        access_token = secrets.token_hex(20)
+        with self._lock:
+            self._tokens[access_token] = time.time() + self.token_lifetime
+        return {
+            'userid': 1,
+            'access_token': access_token,
+            'refresh_token': secrets.token_hex(20),
+            'expires_in': self.token_lifetime,
+            'scope': 'user.metrics,user.info',
+            'token_type': 'Bearer'
+        }
+
+    def token_valid(self, token: Optional[str]) -> bool:
+        """Prüft, ob ein Access Token ausgegeben wurde und nicht abgelaufen ist"""
+        with self._lock:
+            return token in self._tokens and time.time() < self._tokens[token]
+
+    def allow_request(self) -> bool:
+        """Ratenbegrenzung je Sekunde (festes Zeitfenster)"""
+        if self.rate_limit is None:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            return self._window_count <= self.rate_limit
+
+    def inject_error(self) -> bool:
+        """Entscheidet zufällig (error_rate), ob die Anfrage mit HTTP 503 beantwortet wird"""
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def add_measurement(self, date: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+        """
+        Fügt eine neue Messgruppe hinzu (simuliert eine neue Messung)
+
+        Args:
+            date: Unix-Zeit der Messung (Standard: jetzt)
+            seed: Startwert für die Messwerte
+
+        Returns:
+            Die neue Messgruppe
+        """
+        date = int(time.time()) if date is None else date
+        with self._lock:
+            group = generate_groups(1, seed=len(self.groups) if seed is None else seed)[0]
+            group.update({'grpid': max((g['grpid'] for g in self.groups), default=0) + 1,
+                          'date': date, 'created': date, 'modified': int(time.time())})
+            index = bisect.bisect_right(self._dates, date)
+            self.groups.insert(index, group)
+            self._dates.insert(index, date)
+        return group
+
+    def send_notifications(self, startdate: int, enddate: int, appli: int = 4) -> int:
+        """
+        Sendet eine Benachrichtigung (wie Withings) an alle abonnierten Callback-URLs
+
+        Returns:
+            Anzahl erfolgreich zugestellter Benachrichtigungen
+        """
+        data = urlencode({'userid': 1, 'appli': appli, 'startdate': startdate, 'enddate': enddate}).encode()
+        delivered = 0
+        for url in list(self.callback_urls):
+            try:
+                with urllib.request.urlopen(url, data=data, timeout=5):
+                    delivered += 1
+            except OSError:
+                self.stats['notify_failed'] += 1
+        self.stats['notify_sent'] += delivered
+        return delivered
+
+    def measure_page(self, params: Dict) -> Dict:
+        """Body einer getmeas-Antwort für die Anfrage-Parameter"""
+        # Gleiche Sperre wie add_measurement: groups und _dates nur gemeinsam lesen
+        with self._lock:
+            if 'lastupdate' in params:
+                lastupdate = int(params['lastupdate'])
+                selected = [group for group in self.groups if group.get('modified', group['date']) >= lastupdate]
+            else:
+                lower = bisect.bisect_left(self._dates, int(params.get('startdate', 0)))
+                upper = bisect.bisect_right(self._dates, int(params.get('enddate', 2 ** 62)))
+                selected = self.groups[lower:upper]
+
+        offset = int(params.get('offset', 0))
+        page = selected[offset:offset + self.page_size]
+        more = offset + self.page_size < len(selected)
+        body = {'updatetime': int(time.time()), 'timezone': 'Europe/Berlin', 'measuregrps': page,
+                'more': int(more)}
+        if more:
+            body['offset'] = offset + self.page_size
+        return body
+
+
+class MockWithingsHandler(BaseHTTPRequestHandler):
+    """Beantwortet die Withings API Anfragen des WithingsClient"""
+
+    # Keep-Alive wie bei der echten API
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        """Behandelt POST Requests (alle Withings API Aufrufe)"""
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        params = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.inject_error():
+            server.stats['http_503'] += 1
+            self._send(503, b'', {'Retry-After': '1'})
+            return
+
+        if not server.allow_request():
+            server.stats['rate_limited'] += 1
+            self._send_json({'status': 601, 'error': 'Too Many Requests'})
+            return
+
+        if self.path == '/v2/oauth2':
+            server.stats['token'] += 1
+            self._send_json({'status': 0, 'body': server.issue_token()})
+            return
+
+        authorization = self.headers.get('Authorization', '')
+        token = authorization[len('Bearer '):] if authorization.startswith('Bearer ') else None
+        if not server.token_valid(token):
+            server.stats['invalid_token'] += 1
+            self._send_json({'status': 401, 'error': 'XRequestID: Not provided invalid_token'})
+            return
+
+        action = params.get('action')
+        if self.path == '/measure' and action == 'getmeas':
+            server.stats['getmeas'] += 1
+            self._send_json({'status': 0, 'body': server.measure_page(params)})
+        elif self.path == '/notify' and action == 'subscribe' and params.get('callbackurl'):
+            server.stats['subscribe'] += 1
+            server.callback_urls.add(params['callbackurl'])
+            self._send_json({'status': 0, 'body': {}})
+        elif self.path == '/v2/user' and action == 'getdevice':
+            server.stats['getdevice'] += 1
+            self._send_json({'status': 0, 'body': {'devices': MOCK_DEVICES}})
+        else:
+            server.stats['invalid_params'] += 1
+            self._send_json({'status': 503, 'error': 'Invalid Params'})
+
+    def _send_json(self, data: Dict):
+        self._send(200, json.dumps(data).encode(), {'Content-Type': 'application/json'})
+
+    def _send(self, status: int, body: bytes, headers: Dict):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Unterdrücke Server-Log-Nachrichten"""
+        pass
+
+
+def start_mock_server(groups: List[Dict], port: int = 0, **kwargs) -> MockWithingsServer:
+    """
+    Startet den Mock Server in einem Hintergrund-Thread
+
+    Args:
+        groups: Messgruppen
+        port: Port auf localhost (0 = freier Port)
+        kwargs: Weitere Parameter für MockWithingsServer
+
+    Returns:
+        Laufender Server (beenden mit shutdown() und server_close())
+    """
+    server = MockWithingsServer(('127.0.0.1', port), groups, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def write_client_files(server: MockWithingsServer, directory):
+    """
+    Schreibt withings_credentials.json und withings_config.json für den Mock Server
+
+    Args:
+        server: Laufender Mock Server
+        directory: Zielverzeichnis (Arbeitsverzeichnis des Analyzers)
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    token = server.issue_token()
+    with open(directory / 'withings_credentials.json', 'w') as f:
+        json.dump({'client_id': 'mock', 'client_secret': 'mock',
+                   'redirect_uri': 'http://localhost:8080/callback', 'api_base_url': server.url}, f, indent=2)
+    with open(directory / 'withings_config.json', 'w') as f:
+        json.dump({'access_token': token['access_token'], 'refresh_token': token['refresh_token'],
+                   'expires_at': time.time() + token['expires_in']}, f, indent=2)
+
+
+def _notify_loop(server: MockWithingsServer, interval: float):
+    """Erzeugt regelmäßig neue Messungen und benachrichtigt die Abonnenten"""
+    while True:
+        time.sleep(interval)
+        group = server.add_measurement()
+        server.send_notifications(group['date'] - 1, group['date'] + 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler Withings API Mock Server')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (Standard: {DEFAULT_PORT})')
+    parser.add_argument('--groups', type=int, default=5000, help='Anzahl synthetischer Messgruppen')
+    parser.add_argument('--replay', type=str, metavar='DATEI',
+                       help='Aufgezeichnete getmeas-Antworten wiedergeben statt synthetischer Daten')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE, help='Messgruppen pro Seite')
+    parser.add_argument('--latency', type=float, default=0.0, help='Zusätzliche Antwortzeit (Sekunden)')
+    parser.add_argument('--rate-limit', type=float, help='Anfragen pro Sekunde, darüber Status 601')
+    parser.add_argument('--token-lifetime', type=int, default=DEFAULT_TOKEN_LIFETIME,
+                       help='Gültigkeit der Access Tokens (Sekunden)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                       help='Anteil der Anfragen mit HTTP 503 (z.B. 0.1)')
+    parser.add_argument('--seed', type=int, default=0, help='Startwert des Zufallsgenerators')
+    parser.add_argument('--notify-interval', type=float, metavar='SEKUNDEN',
+                       help='Alle N Sekunden eine neue Messung erzeugen und abonnierte Callback-URLs benachrichtigen')
+    parser.add_argument('--write-config', type=str, metavar='VERZEICHNIS',
+                       help='Credentials und Token für den Mock Server in VERZEICHNIS schreiben')
+    args = parser.parse_args()
+
+    groups = load_recorded_groups(args.replay) if args.replay else generate_groups(args.groups, seed=args.seed)
+    server = MockWithingsServer(('127.0.0.1', args.port), groups, page_size=args.page_size,
+                                latency=args.latency, rate_limit=args.rate_limit,
+                                token_lifetime=args.token_lifetime, error_rate=args.error_rate, seed=args.seed)
+    if args.write_config:
+        write_client_files(server, args.write_config)
+        print(f"Credentials und Token gespeichert in {args.write_config}")
+
+    print(f"Withings Mock Server läuft auf {server.url} ({len(groups)} Messgruppen)")
+    if args.notify_interval:
+        threading.Thread(target=_notify_loop, args=(server, args.notify_interval), daemon=True).start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Anfragen: {dict(server.stats)}")
+
+
+if __name__ == '__main__':
+    main()